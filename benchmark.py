@@ -0,0 +1,403 @@
+#!/usr/bin/python
+
+import numpy as np
+import cv2 as cv
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import platform
+import subprocess
+import genetics
+import tracks
+import randomstreams
+import renderer
+import leaderboard
+import footprint
+
+'''
+micro benchmarks of the simulator hot paths, and of the startup (fresh interpreter
+importing the simulation core, the optimizers or the gui), which every worker pays
+
+every benchmark runs for each population size and track scale (the track png is
+upscaled, so rays and images get longer), results are written as json and compared
+against a stored baseline: any benchmark slower than baseline * (1 + threshold)
+is reported as a regression and the exit code is 1
+
+python benchmark.py --output results.json --baseline baseline.json
+python benchmark.py --output baseline.json		(to store a new baseline)
+'''
+
+TRACK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracks", "track1_wp.png")
+
+# modules timed by the startup benchmarks (fresh interpreter + import), None is the bare interpreter
+STARTUP_MODULES = [None, 'simulation', 'optimizers', 'main']
+
+# gui modules the simulation core must not load
+GUI_MODULES = ['matplotlib', 'screeninfo']
+
+
+def scaledTrack(scale, directory):
+
+	'''
+	track png upscaled by scale (nearest neighbour, colours kept), returns its filename
+	'''
+
+	filename = os.path.join(directory, "track_x%g.png" %(scale))
+
+	if not os.path.exists(filename):
+		img = cv.imread(TRACK_FILE, cv.IMREAD_UNCHANGED)
+		img = cv.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)), interpolation = cv.INTER_NEAREST)
+		cv.imwrite(filename, img)
+
+	return filename
+
+def loadTrack(filename):
+
+	trackManager = tracks.TrackManager()
+	trackManager.load(filename)
+
+	return trackManager
+
+def createCars(population, trackManager, seed = 0):
+
+	'''
+	deterministic population placed at the start of the track
+	'''
+
+	streams = randomstreams.RandomStreams(seed)
+	rng = streams.evolution()
+
+	genomes = rng.uniform(-1, 1, (population, genetics.genotypeDimension()))
+	cars = genetics.createCarsFromGenotypes(genomes, streams.cars(0, population))
+
+	for c in cars:
+		c.setPos(trackManager.getStart())
+		c.setSensorBounds(trackManager.getBounds())
+
+	return cars
+
+def measure(function, repeat):
+
+	'''
+	run function repeat times, returns the timings in seconds
+	'''
+
+	timings = []
+
+	for i in range(repeat):
+		start = time.perf_counter()
+		function()
+		timings.append(time.perf_counter() - start)
+
+	return timings
+
+def measureStartup(module, repeat):
+
+	'''
+	start a fresh interpreter importing module repeat times, returns the timings in
+	seconds and the gui modules it loaded
+	'''
+
+	code = "import sys"
+
+	if module is not None:
+		code += ", " + module
+
+	code += "; print(','.join(m for m in %r if m in sys.modules))" %(GUI_MODULES)
+
+	timings = []
+	loaded = ""
+
+	for i in range(repeat):
+		start = time.perf_counter()
+		out = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, cwd = os.path.dirname(os.path.abspath(__file__)))
+		timings.append(time.perf_counter() - start)
+
+		if out.returncode != 0:
+			print("cannot import %s" %(module))
+			print(out.stderr)
+			sys.exit(-1)
+
+		loaded = out.stdout.strip()
+
+	return timings, loaded
+
+
+def benchSensors(cars, trackManager):
+
+	trackImg = trackManager.getImage()
+	trackRes = trackImg.copy()
+
+	def run():
+		for c in cars:
+			c.draw_sensor_lines(trackImg, trackRes)
+
+	return run
+
+def benchDetectCollision(cars, trackManager):
+
+	trackImg = trackManager.getImage()
+	angles = cars[0].sensorAngles()
+
+	def run():
+		for c in cars:
+			for a in angles:
+				sx, sy = int(c.cx), int(c.cy)
+				ex = int(c.cx + c.SENSOR_DISTANCE * np.cos(a + c.steer))
+				ey = int(c.cy + c.SENSOR_DISTANCE * np.sin(a + c.steer))
+				c.detect_collision(trackImg, sx, sy, ex, ey)
+
+	return run
+
+def benchNeuralNetwork(cars, trackManager):
+
+	def run():
+		for c in cars:
+			c.nn.processInputs(c.sensors)
+
+	return run
+
+def benchUpdate(cars, trackManager):
+
+	def run():
+		for c in cars:
+			c.alive = True
+			c.throttle = 1.0
+			c.turn_ratio = 0.1
+			c.update()
+
+	return run
+
+def benchWaypoints(cars, trackManager):
+
+	def run():
+		for c in cars:
+			trackManager.updateDistanceToNextWaypoint(c)
+
+	return run
+
+def benchBestCar(cars, trackManager):
+
+	def run():
+		trackManager.bestCar(cars)
+
+	return run
+
+def benchDraw(cars, trackManager):
+
+	trackImg = trackManager.getImage()
+	trackRes = trackImg.copy()
+
+	def run():
+		for c in cars:
+			c.drawSensors(trackRes)
+			c.draw(trackRes)
+
+	return run
+
+def benchRenderer(cars, trackManager):
+
+	trackImg = trackManager.getImage()
+	trackRes = trackImg.copy()
+	populationRenderer = renderer.PopulationRenderer()
+
+	def run():
+		populationRenderer.draw(trackRes, cars)
+
+	return run
+
+def benchLeaderboard(cars, trackManager):
+
+	ranking = leaderboard.Leaderboard()
+	ranking.reset(cars)
+
+	def run():
+		ranking.update(cars)
+
+	return run
+
+def benchFootprint(cars, trackManager):
+
+	footprints = footprint.Footprint()
+	occupancy = trackManager.getOccupancy()
+
+	def run():
+		footprints.collide(cars, occupancy)
+
+	return run
+
+def benchCrossOver(cars, trackManager):
+
+	rng = np.random.default_rng(0)
+
+	def run():
+		genetics.crossOverAndMutation(cars[0], cars[1 % len(cars)], len(cars), rng)
+
+	return run
+
+
+# name, factory(cars, trackManager) -> callable, one call per tick of the whole population
+BENCHMARKS = [
+	('car.draw_sensor_lines', benchSensors),
+	('car.detect_collision', benchDetectCollision),
+	('neuralnetwork.processInputs', benchNeuralNetwork),
+	('car.update', benchUpdate),
+	('footprint.collide', benchFootprint),
+	('tracks.updateDistanceToNextWaypoint', benchWaypoints),
+	('tracks.bestCar', benchBestCar),
+	('leaderboard.update', benchLeaderboard),
+	('car.draw', benchDraw),
+	('renderer.draw', benchRenderer),
+	('genetics.crossOverAndMutation', benchCrossOver),
+]
+
+
+def run(populations, scales, repeat, only = None):
+
+	'''
+	run every benchmark, returns the list of results
+	'''
+
+	results = []
+
+	for module in STARTUP_MODULES:
+		name = 'startup.' + (module if module is not None else 'python')
+
+		if (only is not None) and not any(o in name for o in only):
+			continue
+
+		timings, loaded = measureStartup(module, repeat)
+		results.append(result(name, 1, 1, timings))
+
+		if loaded != "":
+			print("  %s loads %s" %(name, loaded))
+
+	with tempfile.TemporaryDirectory() as directory:
+
+		for scale in scales:
+
+			filename = scaledTrack(scale, directory)
+
+			if (only is None) or any(o in 'tracks.load' for o in only):
+				timings = measure(lambda: loadTrack(filename), repeat)
+				results.append(result('tracks.load', 1, scale, timings))
+
+			trackManager = loadTrack(filename)
+
+			for population in populations:
+
+				cars = createCars(population, trackManager)
+
+				for name, factory in BENCHMARKS:
+
+					if (only is not None) and not any(o in name for o in only):
+						continue
+
+					# one warm up call
+
+					function = factory(cars, trackManager)
+					function()
+
+					results.append(result(name, population, scale, measure(function, repeat)))
+
+	return results
+
+def result(name, population, scale, timings):
+
+	r = {
+		'name': name,
+		'population': population,
+		'trackScale': scale,
+		'repeat': len(timings),
+		'median': float(np.median(timings)),
+		'min': float(np.min(timings)),
+		'max': float(np.max(timings)),
+	}
+
+	print("%-40s N=%-6d scale=%-4g median %10.3f ms  min %10.3f ms" %(name, population, scale, r['median'] * 1000, r['min'] * 1000))
+
+	return r
+
+def key(r):
+	return (r['name'], r['population'], r['trackScale'])
+
+def compare(results, baseline, threshold):
+
+	'''
+	print the ratio against the baseline, returns the regressions
+	'''
+
+	reference = {key(r): r for r in baseline['results']}
+	regressions = []
+
+	print("")
+	print("%-40s %-8s %-6s %10s %10s %8s" %("benchmark", "N", "scale", "base ms", "now ms", "ratio"))
+
+	for r in results:
+		if key(r) not in reference:
+			continue
+
+		base = reference[key(r)]['median']
+		ratio = r['median'] / base if base > 0 else float('inf')
+		flag = ""
+
+		if ratio > 1 + threshold:
+			flag = "REGRESSION"
+			regressions.append(r)
+
+		print("%-40s %-8d %-6g %10.3f %10.3f %8.2f %s" %(r['name'], r['population'], r['trackScale'], base * 1000, r['median'] * 1000, ratio, flag))
+
+	return regressions
+
+def parseList(text, cast):
+	return [cast(v) for v in text.split(',')]
+
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser(description = "micro benchmarks of the simulator hot paths")
+	parser.add_argument("--populations", default = "10,100,1000", help = "comma separated population sizes")
+	parser.add_argument("--track-scales", default = "1,2", help = "comma separated track upscale factors")
+	parser.add_argument("--repeat", type = int, default = 5, help = "timed runs per benchmark")
+	parser.add_argument("--only", help = "comma separated substrings of the benchmarks to run")
+	parser.add_argument("--output", help = "write the results to this json file")
+	parser.add_argument("--baseline", help = "json results to compare against")
+	parser.add_argument("--threshold", type = float, default = 0.1, help = "allowed slowdown against the baseline (0.1 is 10%%)")
+	args = parser.parse_args()
+
+	only = None
+
+	if args.only is not None:
+		only = args.only.split(',')
+
+	results = run(parseList(args.populations, int), parseList(args.track_scales, float), args.repeat, only)
+
+	report = {
+		'meta': {
+			'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+			'python': platform.python_version(),
+			'numpy': np.__version__,
+			'opencv': cv.__version__,
+			'machine': platform.machine(),
+		},
+		'results': results,
+	}
+
+	if args.output is not None:
+		with open(args.output, 'w') as f:
+			json.dump(report, f, indent = 1)
+
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+
+		regressions = compare(results, baseline, args.threshold)
+
+		if len(regressions) > 0:
+			print("%d regressions over %.0f%%" %(len(regressions), 100 * args.threshold))
+			sys.exit(1)
+
+	sys.exit(0)
@@ -3,7 +3,6 @@
 import math
 import random
 import numpy as np
-import matplotlib.pyplot as plt
 import cv2 as cv
 import neuralnetwork
 import tools
@@ -36,13 +35,17 @@ class Car:
 	CAR_SECONDBEST_COLOR = (0, 255, 0)
 
 	CAR_SPEED_MAX = 2 		# max speed
+	CAR_SPEED_TIME = 1 / 30.0	# speeds are pixels per this many seconds
 	STUCK_TIMEOUT = 20		# time to get to the next waypoint
 
 	CAR_COLLISION_DISTANCE = 0.02 # collision detected if any sensor measure if less than
 
+	TRAJECTORY_SAMPLES = 8			# positions kept to describe the car behaviour
+	TRAJECTORY_INTERVAL = 50		# updates between two trajectory samples
 
 
-	def __init__(self, x = 0, y = 0, steer = 0, color = CAR_NORMAL_COLOR, width = CAR_WIDTH, length = CAR_LENGTH):
+
+	def __init__(self, x = 0, y = 0, steer = 0, color = CAR_NORMAL_COLOR, width = CAR_WIDTH, length = CAR_LENGTH, rng = None):
 
 		self.startx = x
 		self.starty = y
@@ -54,8 +57,15 @@ class Car:
 		self.speed = 0
 		self.throttle = 0
 		self.odometer = 0
-		self.movingTimeout = time.time() + self.STUCK_TIMEOUT
+		self.driveTime = 0 			# seconds driven, pauses excluded
+		self.progressTime = 0 		# driveTime when the best completion was reached
+		self.clock = time.time 		# wall clock unless a simulated one is set
+		self.movingTimeout = self.clock() + self.STUCK_TIMEOUT
 		self.alive = True
+		self.culled = False 		# stopped early by the evaluator, completion is a lower bound
+		self.track = 0 				# index of the track driven in a track set
+		self.substeps = 1 			# physics steps per update (sensors and controller run once)
+		self.sensorCollision = True 	# die on short sensor readings (not needed with footprint collision)
 
 		self.car_color = color
 		self.car_thickness = self.CAR_THICKNESS
@@ -75,6 +85,7 @@ class Car:
 		self.sensorx = 0
 		self.sensory = length / 4
 		self.sensors = np.zeros([self.SENSOR_NUM])
+		self.sensorHits = np.zeros([self.SENSOR_NUM, 4], dtype = np.int64) 	# ray start and hit point of every sensor
 
 		for i in range(self.SENSOR_NUM):
 			self.sensors[i] = self.SENSOR_DISTANCE / self.SENSOR_DISTANCE
@@ -87,7 +98,7 @@ class Car:
 		self.nn.addLayer(4, 3)
 		self.nn.addLayer(3, 2)
 
-		self.nn.randomWeights()
+		self.nn.randomWeights(rng = rng)
 
 		self.output = np.zeros([2])
 
@@ -100,44 +111,84 @@ class Car:
 
 		self.lastUpdateTime = 0
 
+		# behaviour
+		self.ticks = 0
+		self.trajectory = []
 
 		self.paused = False
 		self.pausedWhen = 0
 
 
+	def setClock(self, clock):
+		'''
+		use another time source (e.g. a simulated clock with a fixed step), timers start over
+		'''
+
+		self.clock = clock
+		self.movingTimeout = self.clock() + self.STUCK_TIMEOUT
+		self.lastUpdateTime = 0
+
 	def pause(self):
 		self.paused = True
-		self.pausedWhen = time.time()
+		self.pausedWhen = self.clock()
 
 	def resume(self):
 		self.paused = False
-		#self.lastUpdateTime = self.lastUpdateTime + (time.time() - self.pausedWhen)
-		self.movingTimeout = self.movingTimeout + (time.time() - self.pausedWhen)
+		#self.lastUpdateTime = self.lastUpdateTime + (self.clock() - self.pausedWhen)
+		self.movingTimeout = self.movingTimeout + (self.clock() - self.pausedWhen)
 
-	def update(self):
+	def update(self, imgTrack = None):
 
 		'''
-		updates next position based on controller inputs
+		updates next position based on controller inputs, in substeps physics steps
+		if the track image is given, the way from the old to the new position is
+		checked too (swept collision), so fast cars cannot jump over a wall
 		'''
 
+		# dead cars do not move any more, they keep their final completion
+
+		if not self.alive:
+			return
+
 		# time from last update
 
 		if self.lastUpdateTime > 0:
-			deltaTime = time.time() - self.lastUpdateTime
+			deltaTime = self.clock() - self.lastUpdateTime
 		else:
 			deltaTime = 0
 
-		self.lastUpdateTime = time.time()
+		self.lastUpdateTime = self.clock()
 
 		# have I collide?
 
-		if self.collision(): 
+		if self.sensorCollision and self.collision(): 
 			self.alive = False
 			return
 
 		if self.paused:
 			return
 
+		self.driveTime += deltaTime
+
+		for i in range(self.substeps):
+			if not self.step(deltaTime / self.substeps, imgTrack):
+				self.alive = False
+				return
+
+		# sample trajectory
+
+		self.ticks += 1
+
+		if (self.ticks % self.TRAJECTORY_INTERVAL == 0) and (len(self.trajectory) < self.TRAJECTORY_SAMPLES):
+			self.trajectory.append((self.cx, self.cy))
+
+	def step(self, deltaTime, imgTrack = None):
+
+		'''
+		one physics step of deltaTime seconds
+		returns False if the car would hit a wall on its way (it is kept before it)
+		'''
+
 		# calc acceleration
 
 		if self.throttle > self.CAR_THROTTLE_MAX:
@@ -177,13 +228,40 @@ class Car:
 		oldcx = self.cx
 		oldcy = self.cy
 
-		self.cx += math.cos(self.steer + math.pi/2) * self.speed
-		self.cy += math.sin(self.steer + math.pi/2) * self.speed
+		distance = self.speed * deltaTime / self.CAR_SPEED_TIME
+
+		self.cx += math.cos(self.steer + math.pi/2) * distance
+		self.cy += math.sin(self.steer + math.pi/2) * distance
+
+		if (imgTrack is not None) and not self.sweep(imgTrack, oldcx, oldcy, self.cx, self.cy):
+			self.cx = oldcx
+			self.cy = oldcy
+			return False
 
 		# distance from last point
 
 		self.odometer += tools.distance(self.cx, self.cy, oldcx, oldcy)
 
+		return True
+
+	def sweep(self, imgTrack, x0, y0, x1, y1):
+
+		'''
+		True if every pixel from (x0, y0) to (x1, y1) is track
+		'''
+
+		x0 = int(x0)
+		y0 = int(y0)
+		x1 = int(x1)
+		y1 = int(y1)
+
+		if (x0 == x1) and (y0 == y1):
+			return True
+
+		# detect_collision returns the end point when the line is free, and when only the end point is not
+
+		return (self.detect_collision(imgTrack, x0, y0, x1, y1) == (x1, y1)) and self.checkColor(imgTrack, x1, y1)
+
 
 
 	def checkForStuck(self):
@@ -197,22 +275,28 @@ class Car:
 		if self.alive and not self.paused:
 
 			if self.trackCompletion > self.bestTrackCompletion:
-				self.movingTimeout = time.time() + self.STUCK_TIMEOUT
+				self.movingTimeout = self.clock() + self.STUCK_TIMEOUT
 				self.bestTrackCompletion = self.trackCompletion
+				self.progressTime = self.driveTime
 			else:
-				if time.time() > self.movingTimeout:
+				if self.clock() > self.movingTimeout:
 					self.alive = False
 
 	
 	def reset(self):
 		self.alive = True
-		self.moving = time.time() + self.STUCK_TIMEOUT
+		self.moving = self.clock() + self.STUCK_TIMEOUT
 		self.odometer = 0
+		self.driveTime = 0
+		self.progressTime = 0
+		self.ticks = 0
+		self.trajectory = []
 		self.trackCompletion = 0
 		self.waypointIndex = 0
 		self.currentWayPointCompletion = 0
 		self.bestTrackCompletion = 0
 		self.paused = False
+		self.culled = False
 
 
 	def setNormalColor(self):
@@ -233,6 +317,18 @@ class Car:
 		if any oclusion found the stop and return collision point and modular distance [0, 1]
 		'''
 
+		sx, sy, px, py, d = self.sensor_line(imgTrack, angle)
+
+		# paint rays
+		cv.line(imgRes, (sx, sy), (px, py), (0, 0, 255), 1)
+
+		return px, py, d
+
+	def sensor_line(self, imgTrack, angle):
+		'''
+		trace one sensor ray, returns its start, collision point and modular distance [0, 1]
+		'''
+
 		# start point
 		sx, sy = tools.rotate(self.sensorx, self.sensory, self.steer)
 		sx += self.cx
@@ -254,12 +350,9 @@ class Car:
 		# check if collision from sx,sy to ex,ey
 		px, py = self.detect_collision(imgTrack, sx, sy, ex, ey)
 
-		# paint rays
-		cv.line(imgRes, (sx, sy), (px, py), (0, 0, 255), 1)
-
 		# return collision point of ray plus normalized distance
 
-		return px, py, tools.min(tools.distance(sx, sy, px, py), self.SENSOR_DISTANCE) / self.SENSOR_DISTANCE
+		return sx, sy, px, py, tools.min(tools.distance(sx, sy, px, py), self.SENSOR_DISTANCE) / self.SENSOR_DISTANCE
 
 
 	def detect_collision(self, imgTrack, x1, y1, x2, y2):
@@ -341,18 +434,47 @@ class Car:
 		'''
 
 
-		if self.alive:
+		self.sense(imgTrack)
+		self.drawSensors(imgResult)
 
-			# calc angle and angle increment for a given aperture
+	def sense(self, imgTrack):
+
+		'''
+		update sensor measurements, ray hit points are kept for drawSensors
+		'''
 
-			sensor_initial_angle = (math.pi/2) - ((self.SENSOR_APERTURE / 2) * math.pi / 180)
-			sensor_incremental_angle = (self.SENSOR_APERTURE * math.pi / 180) / (self.SENSOR_NUM - 1)
+		if self.alive:
 
 			# calc all sensor readings
 
+			angles = self.sensorAngles()
+
 			for i in range(self.SENSOR_NUM):
-				x, y, self.sensors[i] = self.draw_sensor_line(imgTrack, imgResult, sensor_initial_angle + sensor_incremental_angle * i)
-				cv.circle(imgResult, (x, y), self.SENSOR_RADIUS, self.SENSOR_COLOR, 1)
+				sx, sy, px, py, self.sensors[i] = self.sensor_line(imgTrack, angles[i])
+				self.sensorHits[i] = (sx, sy, px, py)
+
+	def drawSensors(self, imgResult):
+
+		'''
+		paint the sensor rays of the last measurement
+		'''
+
+		if self.alive:
+
+			for sx, sy, px, py in self.sensorHits:
+				cv.line(imgResult, (int(sx), int(sy)), (int(px), int(py)), (0, 0, 255), 1)
+				cv.circle(imgResult, (int(px), int(py)), self.SENSOR_RADIUS, self.SENSOR_COLOR, 1)
+
+	def sensorAngles(self):
+
+		'''
+		angle of every sensor ray relative to the car, for the given aperture
+		'''
+
+		sensor_initial_angle = (math.pi/2) - ((self.SENSOR_APERTURE / 2) * math.pi / 180)
+		sensor_incremental_angle = (self.SENSOR_APERTURE * math.pi / 180) / (self.SENSOR_NUM - 1)
+
+		return [sensor_initial_angle + sensor_incremental_angle * i for i in range(self.SENSOR_NUM)]
 
 	def draw(self, img):
 
@@ -440,10 +562,22 @@ class Car:
 	def isAlive(self):
 		return self.alive
 
+	def cull(self):
+		'''
+		stop this car before its time, its completion so far is kept as a lower bound of its fitness
+		'''
+
+		if self.alive:
+			self.alive = False
+			self.culled = True
+
+	def isCulled(self):
+		return self.culled
+
 	def getTimer(self):
 		if self.alive:
 			if not self.paused:
-				return int(self.movingTimeout - time.time())
+				return int(self.movingTimeout - self.clock())
 			else:
 				return int(self.movingTimeout - self.pausedWhen)
 		else:
@@ -456,6 +590,13 @@ class Car:
 
 		return self.nn.getWeights()
 
+	def getGenotypeDimension(self):
+		'''
+		number of genes of this individual
+		'''
+
+		return self.nn.getDimension()
+
 	def setGenotype(self, w):
 		'''
 		set features of this individual
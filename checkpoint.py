@@ -0,0 +1,203 @@
+import numpy as np
+import threading
+import queue
+import os
+import sys
+import json
+import optimizers
+import randomstreams
+
+'''
+generation checkpoints
+
+a checkpoint is a compressed .npz holding the optimizer state (genome matrix, fitness
+history, best genome...), the generation counter, the run seed, the state of the
+evolution random stream, the novelty archive if any and, with racing, which genomes
+of the last generation were culled (their fitness is a lower bound)
+
+the run configuration (tracks, time step, objectives, racing schedule...) is saved
+too, as json: a run is only resumed with the configuration it was started with
+
+snapshots are taken on the main thread (just array copies) and compressed and written
+on a background thread, so the simulation never waits for the disk
+'''
+
+OPTIMIZER_PREFIX = 'optimizer_'
+
+
+def snapshot(optimizer, streams, noveltySearch = None, lowerBounds = None, config = None):
+
+	'''
+	dict of arrays describing the run right after optimizer.tell
+	'''
+
+	state = {}
+
+	for name, value in optimizer.getState().items():
+		state[OPTIMIZER_PREFIX + name] = np.array(value)
+
+	state['optimizer'] = np.asarray(optimizer.name)
+	state['dimension'] = np.asarray(optimizer.dimension)
+	state['popsize'] = np.asarray(optimizer.popsize)
+
+	# seeds and generator states are big integers, kept as text
+	state['seed'] = np.asarray(str(streams.seed))
+	state['rng'] = np.asarray(json.dumps(optimizer.rng.bit_generator.state))
+
+	if noveltySearch is not None:
+		state['novelty_archive'] = noveltySearch.archive.getPoints()
+
+	if lowerBounds is not None:
+		state['lower_bounds'] = np.asarray(lowerBounds, dtype = bool)
+
+	if config is not None:
+		state['config'] = np.asarray(json.dumps(config, sort_keys = True))
+
+	return state
+
+def write(filename, state):
+
+	'''
+	write a snapshot, through a temporary file so a crash never leaves half a checkpoint
+	'''
+
+	tmp = filename + '.tmp'
+
+	with open(tmp, 'wb') as f:
+		np.savez_compressed(f, **state)
+
+	os.replace(tmp, filename)
+
+def load(filename):
+
+	'''
+	read a checkpoint, returns its dict of arrays
+	'''
+
+	if not os.path.exists(filename):
+		print("checkpoint %s not found" %(filename))
+		sys.exit(-1)
+
+	with np.load(filename) as data:
+		return {name: data[name] for name in data.files}
+
+def checkConfig(state, config):
+
+	'''
+	exit if the run configuration differs from the one saved in a checkpoint
+	'''
+
+	if 'config' not in state:
+		print("checkpoint has no run configuration, resuming with the given options unchecked")
+		return
+
+	saved = json.loads(str(state['config']))
+
+	# through json too, so tuples and lists compare equal
+	config = json.loads(json.dumps(config))
+
+	differ = [key for key in sorted(set(saved) | set(config)) if saved.get(key) != config.get(key)]
+
+	if len(differ) > 0:
+		print("checkpoint was taken with other options:")
+
+		for key in differ:
+			print("  %s: %s, now %s" %(key, saved.get(key), config.get(key)))
+
+		print("resume with the same options")
+		sys.exit(-1)
+
+def restore(state, noveltySearch = None):
+
+	'''
+	rebuild the optimizer and the random streams of a checkpoint
+	returns both, the optimizer generation counter tells how many generations are done
+	'''
+
+	streams = randomstreams.RandomStreams(int(str(state['seed'])))
+	rng = streams.evolution()
+	rng.bit_generator.state = json.loads(str(state['rng']))
+
+	optimizer = optimizers.createOptimizer(str(state['optimizer']), int(state['dimension']), int(state['popsize']), rng)
+
+	prefix = len(OPTIMIZER_PREFIX)
+	optimizer.setState({name[prefix:]: value for name, value in state.items() if name.startswith(OPTIMIZER_PREFIX)})
+
+	if (noveltySearch is not None) and ('novelty_archive' in state) and (state['novelty_archive'].size > 0):
+		noveltySearch.archive.add(state['novelty_archive'])
+
+	return optimizer, streams
+
+
+class CheckpointWriter:
+
+	'''
+	writes a checkpoint every N generations on a background thread
+	a write failing on the thread is reported by the next save or close
+	'''
+
+	def __init__(self, filename, every = 10, config = None):
+
+		if (every < 1):
+			print("checkpoints must be written every 1 generation at least")
+			sys.exit(-1)
+
+		self.filename = filename
+		self.every = every
+		self.config = config
+		self.error = None
+
+		self.queue = queue.Queue()
+		self.thread = threading.Thread(target = self.run, daemon = True)
+		self.thread.start()
+
+	def run(self):
+
+		while True:
+			state = self.queue.get()
+
+			if state is None:
+				self.queue.task_done()
+				return
+
+			try:
+				write(self.filename, state)
+			except Exception as e:
+				self.error = e
+
+			self.queue.task_done()
+
+	def update(self, optimizer, streams, noveltySearch = None, lowerBounds = None):
+		'''
+		to be called after every optimizer.tell, snapshots the run when due
+		'''
+
+		if optimizer.generation % self.every == 0:
+			self.save(optimizer, streams, noveltySearch, lowerBounds)
+
+	def save(self, optimizer, streams, noveltySearch = None, lowerBounds = None):
+		'''
+		queue a snapshot, returns at once
+		'''
+
+		self.check()
+		self.queue.put(snapshot(optimizer, streams, noveltySearch, lowerBounds, self.config))
+
+	def close(self):
+		'''
+		wait until every queued checkpoint is on disk
+		'''
+
+		self.queue.put(None)
+		self.thread.join()
+
+		self.check()
+
+	def check(self):
+		'''
+		exit if a checkpoint could not be written
+		'''
+
+		if self.error is not None:
+			print("checkpoint %s could not be written: %s" %(self.filename, self.error))
+			sys.exit(-1)
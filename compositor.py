@@ -0,0 +1,94 @@
+import numpy as np
+import cv2 as cv
+
+'''
+dirty-region compositing in display coordinates
+
+the static track is scaled to the display size once and kept; the frame shown is
+drawn directly in display pixels and, instead of copying and resizing the whole
+track every frame, only the tiles touched by the previous frame (cars, sensors,
+stats) are restored from the cached background, so a frame costs what moves and
+not the resolution of the track
+'''
+
+
+def displaySize(img, screenSize, verticalAdjust = 0.9):
+
+	'''
+	width and height of img fitted to the screen height, keeping its aspect ratio
+	'''
+
+	aspectRatio = img.shape[1] / img.shape[0]
+
+	return int(screenSize[1] * verticalAdjust * aspectRatio), int(screenSize[1] * verticalAdjust)
+
+
+class Compositor:
+
+	'''
+	cached scaled background plus a frame restored tile by tile
+	'''
+
+	TILE = 32
+
+	def __init__(self, background, size):
+
+		width, height = size
+
+		self.scale = height / background.shape[0]
+		self.background = cv.resize(background, (width, height), interpolation = cv.INTER_CUBIC)
+		self.frame = self.background.copy()
+
+		self.tiles = np.zeros(((height + self.TILE - 1) // self.TILE, (width + self.TILE - 1) // self.TILE), dtype = bool)
+
+	def mark(self, boxes):
+		'''
+		mark the tiles under boxes (M, 4) x0, y0, x1, y1 (inclusive, display pixels) as dirty
+		'''
+
+		boxes = np.asarray(boxes, dtype = int).reshape(-1, 4)
+
+		if len(boxes) == 0:
+			return
+
+		rows, cols = self.tiles.shape
+
+		tx0 = np.clip(boxes[:, 0] // self.TILE, 0, cols - 1)
+		ty0 = np.clip(boxes[:, 1] // self.TILE, 0, rows - 1)
+		tx1 = np.clip(boxes[:, 2] // self.TILE, 0, cols - 1)
+		ty1 = np.clip(boxes[:, 3] // self.TILE, 0, rows - 1)
+
+		# boxes are small, so loop over the tile span instead of the boxes
+
+		for dy in range(int(np.max(ty1 - ty0)) + 1):
+			for dx in range(int(np.max(tx1 - tx0)) + 1):
+				self.tiles[np.minimum(ty0 + dy, ty1), np.minimum(tx0 + dx, tx1)] = True
+
+	def markAll(self):
+		self.tiles[:] = True
+
+	def restore(self):
+		'''
+		copy the background over the dirty tiles, one slice per run of dirty tiles
+		in a row of tiles, returns the frame ready to be drawn on
+		'''
+
+		T = self.TILE
+
+		for row in np.flatnonzero(self.tiles.any(axis = 1)):
+			dirty = np.concatenate(([False], self.tiles[row], [False]))
+			edges = np.flatnonzero(dirty[1:] != dirty[:-1])
+
+			for start, end in zip(edges[::2], edges[1::2]):
+				self.frame[row * T:(row + 1) * T, start * T:end * T] = self.background[row * T:(row + 1) * T, start * T:end * T]
+
+		self.tiles[:] = False
+
+		return self.frame
+
+	def dirtyFraction(self):
+		'''
+		share of the frame to be restored, for statistics
+		'''
+
+		return np.mean(self.tiles)
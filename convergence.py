@@ -0,0 +1,259 @@
+#!/usr/bin/python
+
+import numpy as np
+import argparse
+import json
+import sys
+import time
+import platform
+import optimizers
+import genetics
+import randomstreams
+import simulation
+import trackset
+import curriculum as curricula
+import racing
+
+'''
+time-to-solution benchmark
+
+trains headless on a fixed set of tracks and seeds, for every optimizer, population
+size and engine, and records the wall time, simulated car-ticks and generations
+needed for the best car to reach every completion target
+
+results are summarized over seeds with the median and the spread (25% and 75%
+percentiles); seeds never reaching a target are counted apart
+
+--tracks takes the same comma separated track set as main.py: every genome is
+evaluated on all of them and its fitness aggregated (--aggregate, --track-weights);
+repeat --tracks to benchmark several track sets one after the other
+
+with --curriculum S genomes are trained from S start points along the track for a
+short horizon (see curriculum.py); targets are then checked by driving the best
+genome over the whole track, and these ticks are counted too
+
+with --racing the worst cars are stopped early by successive halving (see racing.py),
+the car-ticks saved show up in the carTicks and wall time of every target
+
+python convergence.py --optimizers ga,cmaes --populations 10,20 --seeds 0,1,2 --output convergence.json
+'''
+
+
+def train(trackFiles, optimizerName, population, engine, seed, targets, maxGenerations, dt, aggregate = 'mean', curriculum = None, substeps = 1, collision = 'sensors', racer = None, trackWeights = None):
+
+	'''
+	one headless training run on a comma separated track set, returns when every
+	target is reached (or maxGenerations)
+	'''
+
+	streams = randomstreams.RandomStreams(seed)
+	sim = simulation.Simulation(dt = dt, engine = engine, trackSet = trackset.TrackSet(trackFiles.split(','), aggregate, trackWeights), substeps = substeps, collision = collision)
+	optimizer = optimizers.createOptimizer(optimizerName, genetics.genotypeDimension(), population, streams.evolution())
+
+	# the whole track from its start, to check a curriculum against the targets
+	fullTrack = curricula.Curriculum(1, None)
+	bestFitness = None
+	bestCompletion = 0.0
+
+	reached = {}
+	culled = 0
+	start = time.perf_counter()
+
+	while (optimizer.generation < maxGenerations) and (len(reached) < len(targets)):
+
+		genomes = optimizer.ask()
+		rngs = streams.cars(optimizer.generation, population)
+
+		if curriculum is None:
+			cars = sim.evaluate(genomes, rngs, racer)
+			fitness = sim.fitness(cars)
+
+			if racer is not None:
+				culled += racer.numCulled
+		else:
+			cars, fitness = curriculum.evaluate(sim, genomes, rngs)
+
+		optimizer.tell(genomes, fitness)
+
+		if curriculum is None:
+			bestCompletion = optimizer.getBest()[1]
+		elif optimizer.getBest()[1] != bestFitness:
+			bestFitness = optimizer.getBest()[1]
+			bestCompletion = fullTrack.evaluate(sim, [optimizer.getBest()[0]])[1][0]
+
+		for target in targets:
+			if (target not in reached) and (bestCompletion >= target):
+				reached[target] = {
+					'wallTime': time.perf_counter() - start,
+					'carTicks': sim.carTicks,
+					'ticks': sim.ticks,
+					'generations': optimizer.generation,
+				}
+
+	return {
+		'track': trackFiles,
+		'optimizer': optimizerName,
+		'population': population,
+		'engine': engine,
+		'seed': seed,
+		'curriculum': None if curriculum is None else {'starts': curriculum.starts, 'horizon': curriculum.horizon},
+		'racing': None if racer is None else {'rungs': racer.rungs(), 'cullFraction': racer.cullFraction, 'culled': culled},
+		'bestCompletion': float(bestCompletion),
+		'generations': optimizer.generation,
+		'wallTime': time.perf_counter() - start,
+		'carTicks': sim.carTicks,
+		'reached': {str(t): reached[t] for t in reached},
+	}
+
+def summarize(runs, targets):
+
+	'''
+	median and spread over seeds of every configuration and target
+	'''
+
+	groups = {}
+
+	for r in runs:
+		config = (r['track'], r['optimizer'], r['population'], r['engine'])
+		groups.setdefault(config, []).append(r)
+
+	summary = []
+
+	for config, group in groups.items():
+		for target in targets:
+			hits = [r['reached'][str(target)] for r in group if str(target) in r['reached']]
+
+			row = {
+				'track': config[0],
+				'optimizer': config[1],
+				'population': config[2],
+				'engine': config[3],
+				'target': target,
+				'seeds': len(group),
+				'reached': len(hits),
+			}
+
+			for metric in ('wallTime', 'carTicks', 'generations'):
+				values = [h[metric] for h in hits]
+
+				if len(values) > 0:
+					row[metric] = {
+						'median': float(np.median(values)),
+						'p25': float(np.percentile(values, 25)),
+						'p75': float(np.percentile(values, 75)),
+					}
+
+			summary.append(row)
+
+	return summary
+
+def printSummary(summary):
+
+	print("%-24s %-10s %-6s %-8s %-6s %-7s %16s %20s %12s" %("track", "optimizer", "N", "engine", "target", "reached", "wall s", "car-ticks", "generations"))
+
+	for row in summary:
+		text = "%-24s %-10s %-6d %-8s %-6g %3d/%-3d" %(row['track'][-24:], row['optimizer'], row['population'], row['engine'], row['target'], row['reached'], row['seeds'])
+
+		if row['reached'] > 0:
+			text += " %7.1f [%5.1f-%5.1f] %9d [%d-%d] %4d [%d-%d]" %(
+				row['wallTime']['median'], row['wallTime']['p25'], row['wallTime']['p75'],
+				row['carTicks']['median'], row['carTicks']['p25'], row['carTicks']['p75'],
+				row['generations']['median'], row['generations']['p25'], row['generations']['p75'])
+
+		print(text)
+
+def parseList(text, cast):
+	return [cast(v) for v in text.split(',')]
+
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser(description = "time-to-solution benchmark")
+	parser.add_argument("--tracks", action = "append", help = "comma separated track files every genome is evaluated on, as in main.py; repeat to benchmark several track sets")
+	parser.add_argument("--aggregate", default = "mean", choices = trackset.AGGREGATES, help = "how the completions of a genome over the tracks make its fitness")
+	parser.add_argument("--track-weights", action = "append", help = "comma separated weight of every track, for --aggregate weighted; one per --tracks")
+	parser.add_argument("--optimizers", default = "ga", help = "comma separated optimizers, see main.py --optimizer")
+	parser.add_argument("--populations", default = "20", help = "comma separated population sizes")
+	parser.add_argument("--engines", default = "python", help = "comma separated engines, see simulation.ENGINES")
+	parser.add_argument("--seeds", default = "0,1,2", help = "comma separated seeds")
+	parser.add_argument("--targets", default = "0.5,0.9,1.0", help = "comma separated completion targets")
+	parser.add_argument("--curriculum", type = int, metavar = "S", help = "train from S start points along the track at once, short horizons")
+	parser.add_argument("--horizon", type = int, default = 400, help = "ticks raced from every start point with --curriculum")
+	parser.add_argument("--racing", action = "store_true", help = "stop the worst cars early by successive halving, see main.py --racing")
+	parser.add_argument("--rung-horizon", type = int, default = 200, help = "ticks before the first cull with --racing")
+	parser.add_argument("--rung-growth", type = float, default = 2.0, help = "horizon multiplier between culls with --racing")
+	parser.add_argument("--rungs", type = int, default = 4, help = "number of culls per generation with --racing")
+	parser.add_argument("--cull-fraction", type = float, default = 0.5, help = "fraction of racing cars stopped at each cull with --racing")
+	parser.add_argument("--max-generations", type = int, default = 100, help = "give up after this many generations")
+	parser.add_argument("--dt", type = float, default = 1 / 30.0, help = "simulated seconds per tick")
+	parser.add_argument("--substeps", type = int, default = 1, help = "physics steps per tick")
+	parser.add_argument("--collision", default = "sensors", choices = simulation.COLLISIONS, help = "how cars hit the walls, see simulation.COLLISIONS")
+	parser.add_argument("--output", help = "write runs and summary to this json file")
+	args = parser.parse_args()
+
+	targets = parseList(args.targets, float)
+	runs = []
+
+	if args.tracks is None:
+		args.tracks = ["tracks/track1_wp.png"]
+
+	# the weights of every track set, in the order of --tracks
+
+	trackWeights = [None] * len(args.tracks)
+
+	if args.track_weights is not None:
+		if len(args.track_weights) != len(args.tracks):
+			print("expecting one --track-weights per --tracks")
+			sys.exit(-1)
+
+		trackWeights = [parseList(w, float) for w in args.track_weights]
+
+	curriculum = None
+
+	if args.curriculum is not None:
+		curriculum = curricula.Curriculum(args.curriculum, args.horizon)
+
+	racer = None
+
+	if args.racing:
+		if curriculum is not None:
+			print("--racing and --curriculum cannot be combined, a curriculum already stops its cars")
+			sys.exit(-1)
+
+		racer = racing.SuccessiveHalving(args.rung_horizon, args.rung_growth, args.cull_fraction, args.rungs)
+
+	for trackFiles, weights in zip(args.tracks, trackWeights):
+		for optimizerName in args.optimizers.split(','):
+			for population in parseList(args.populations, int):
+				for engine in args.engines.split(','):
+					for seed in parseList(args.seeds, int):
+						r = train(trackFiles, optimizerName, population, engine, seed, targets, args.max_generations, args.dt, args.aggregate, curriculum, args.substeps, args.collision, racer, weights)
+						print("%s %s N=%d %s seed=%d best %.1f%% in %d generations, %.1f s" %(trackFiles, optimizerName, population, engine, seed, 100 * r['bestCompletion'], r['generations'], r['wallTime']))
+						runs.append(r)
+
+	summary = summarize(runs, targets)
+
+	print("")
+	printSummary(summary)
+
+	if args.output is not None:
+		with open(args.output, 'w') as f:
+			json.dump({
+				'meta': {
+					'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+					'python': platform.python_version(),
+					'numpy': np.__version__,
+					'machine': platform.machine(),
+					'dt': args.dt,
+					'substeps': args.substeps,
+					'collision': args.collision,
+					'aggregate': args.aggregate,
+					'trackWeights': trackWeights,
+					'racing': args.racing,
+					'maxGenerations': args.max_generations,
+				},
+				'runs': runs,
+				'summary': summary,
+			}, f, indent = 1)
+
+	sys.exit(0)
@@ -0,0 +1,202 @@
+import numpy as np
+import math
+import sys
+
+'''
+curriculum evaluation from mid-track start points
+
+instead of always starting at the track start, every genome drives one car from
+each of a few evenly spaced waypoints, heading along the track; all of these
+segments are simulated at once (like the tracks of a track set) for a short
+horizon only, and a car is stopped as soon as it covered its segment
+
+the fitness of a genome is the mean, over the segments, of the share of its
+segment every car covered, so a genome failing the first corner is still rated on
+the rest of the track, and good genomes do not drive the easy start again and again
+
+cars are laid out track after track, then start after start: car (t * S + s) * N + i
+is genome i from start s of track t
+'''
+
+
+class Curriculum:
+
+	'''
+	starts evenly spaced start points per track, raced for horizon ticks
+	(until every car died if horizon is None)
+	'''
+
+	HEADING_RANGE = 45			# degrees searched around the waypoint direction
+	HEADING_STEP = 5
+	HEADING_DISTANCE = 150		# length of the rays looking for the free direction
+
+	def __init__(self, starts = 4, horizon = 400):
+
+		if starts < 1:
+			print("expecting at least one start point")
+			sys.exit(-1)
+
+		if (horizon is not None) and (horizon < 1):
+			print("horizon must be at least one tick")
+			sys.exit(-1)
+
+		self.starts = starts
+		self.horizon = horizon
+
+		self.startCompletion = np.zeros(0)
+		self.span = np.zeros(0)
+
+		# simulation being raced and the index of every one of its cars
+		self.sim = None
+		self.index = {}
+
+	def startWaypoints(self, trackManager):
+		'''
+		index of the waypoint every segment starts from, -1 is the start of the track
+		'''
+
+		n = trackManager.numWaypoints()
+
+		if self.starts > n:
+			print("cannot start from %d points, the track has %d waypoints" %(self.starts, n))
+			sys.exit(-1)
+
+		return [int(j * n / self.starts) - 1 for j in range(self.starts)]
+
+	def heading(self, trackManager, k):
+		'''
+		direction (radians) of the track at waypoint k: halfway between where the
+		track comes from and the next waypoint, turned to the clearest way around
+		it (the straight line to the next waypoint may cross a corner)
+		'''
+
+		img = trackManager.getImage()
+		h, w = img.shape[:2]
+
+		points = [trackManager.getStart()] + [wp.getPos() for wp in trackManager.getWaypoints()]
+		x, y = points[k + 1]
+		nx, ny = points[k + 2]
+
+		direction = math.atan2(ny - y, nx - x)
+
+		if k >= 0:
+			px, py = points[k]
+			incoming = math.atan2(y - py, x - px)
+			direction = math.atan2(math.sin(direction) + math.sin(incoming), math.cos(direction) + math.cos(incoming))
+
+		# the smallest deviations first, so the waypoint direction wins ties
+		deviations = sorted(np.radians(np.arange(-self.HEADING_RANGE, self.HEADING_RANGE + 1, self.HEADING_STEP)), key = abs)
+		angles = direction + np.array(deviations)
+
+		steps = np.arange(1, self.HEADING_DISTANCE + 1)
+		px = (x + np.cos(angles)[:, None] * steps).astype(int)
+		py = (y + np.sin(angles)[:, None] * steps).astype(int)
+
+		inside = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+		free = inside & np.all(img[np.clip(py, 0, h - 1), np.clip(px, 0, w - 1)] == 255, axis = 2)
+
+		# free length of every ray, up to the first wall
+		clearance = np.where(np.all(free, axis = 1), len(steps), np.argmin(free, axis = 1))
+
+		return angles[int(np.argmax(clearance))]
+
+	def spawn(self, car, trackManager, k):
+		'''
+		put a car on waypoint k (already crossed) heading to waypoint k + 1
+		returns the completion it starts with
+		'''
+
+		if k < 0:
+			car.setPos(trackManager.getStart())
+		else:
+			car.setPos(trackManager.getWaypoints()[k].getPos())
+
+		# cars move along steer + 90 degrees
+		car.steer = self.heading(trackManager, k) - math.pi / 2
+
+		car.waypointIndex = k + 1
+		car.trackCompletion = (k + 1) * trackManager.perWayPointCompletion
+		car.bestTrackCompletion = car.trackCompletion
+		car.currentWayPointCompletion = 0
+
+		return car.trackCompletion
+
+	def createCars(self, sim, genomes, rngs = None):
+		'''
+		one car per genome, start point (and track), placed at its start point
+		'''
+
+		n = len(genomes)
+
+		genomes = [w for s in range(self.starts) for w in genomes]
+
+		if rngs is not None:
+			rngs = list(rngs) * self.starts
+
+		cars = sim.createCars(genomes, rngs)
+
+		self.startCompletion = np.zeros(len(cars))
+		self.span = np.zeros(len(cars))
+
+		self.sim = sim
+		self.index = {id(car): i for i, car in enumerate(cars)}
+
+		for t, trackManager in enumerate(sim.trackManagers):
+			starts = self.startWaypoints(trackManager)
+			completions = [(k + 1) * trackManager.perWayPointCompletion for k in starts] + [1.0]
+
+			for s, k in enumerate(starts):
+				first = (t * self.starts + s) * n
+
+				for i in range(first, first + n):
+					self.startCompletion[i] = self.spawn(cars[i], trackManager, k)
+					self.span[i] = completions[s + 1] - completions[s]
+
+		return cars
+
+	def reset(self):
+		pass
+
+	def update(self, cars, tick):
+		'''
+		stop the cars that covered their whole segment, they cannot score more
+		(called every tick by Simulation.run, like a racer), only the active cars
+		of the simulation are looked at, the dead ones were dropped from it
+		'''
+
+		for car in self.sim.active:
+			i = self.index[id(car)]
+
+			if car.alive and (car.completion() - self.startCompletion[i] >= self.span[i]):
+				car.alive = False
+
+	def progress(self, cars):
+		'''
+		share of its segment covered by every car, in [0, 1]
+		'''
+
+		completion = np.array([car.completion() for car in cars], dtype = np.float64)
+
+		return np.clip((completion - self.startCompletion) / self.span, 0, 1)
+
+	def fitness(self, sim, cars):
+		'''
+		mean progress over the segments of every genome (aggregated over the tracks of a track set)
+		'''
+
+		progress = self.progress(cars).reshape(len(sim.trackManagers), self.starts, -1).mean(axis = 1)
+
+		if sim.trackSet is None:
+			return progress[0]
+
+		return sim.trackSet.combine(progress)
+
+	def evaluate(self, sim, genomes, rngs = None):
+		'''
+		race every segment for the horizon, returns the cars and the fitness of every genome
+		'''
+
+		cars = self.createCars(sim, genomes, rngs)
+		sim.run(cars, self, self.horizon)
+
+		return cars, self.fitness(sim, cars)
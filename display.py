@@ -0,0 +1,379 @@
+import cv2 as cv
+import copy
+import queue
+import threading
+import time
+import tools
+import compositor as compositing
+import profiler as profiling
+import hud as overlay
+
+'''
+display loop and simulation thread
+
+the windows stay on the main thread (HighGUI is only supported there on some
+platforms) while the simulation runs on a worker thread; the simulation does not
+wait for the screen: after every tick it calls publish(), which copies the cars
+into a snapshot only when the display loop took the previous one (double buffering,
+the simulation fills a new snapshot while the display loop draws the one before),
+so frames the screen cannot keep up with are dropped instead of slowing the
+simulation down
+
+the display loop owns every window (all imshow and waitKey calls happen on it),
+draws at a target fps and reads the keyboard; keys are queued for the simulation,
+except '+' and '-' which change live how many ticks are simulated per displayed
+frame (0 runs the simulation as fast as it can)
+'''
+
+MAX_TICKS_PER_FRAME = 1024
+
+ZOOM_AREA_WIDTH = 100
+ZOOM_AREA_HEIGHT = 100
+
+def zoom(img, x, y, zoomPercent = 2.0):
+	
+	'''
+	creates an img with the zoomed portion of img around (x,y) position
+	'''
+
+	imgWidth = img.shape[1]
+	imgHeight = img.shape[0]
+
+	xmin = int(tools.max(0, x - ZOOM_AREA_WIDTH / 2))
+	xmax = int(tools.min(imgWidth, x + ZOOM_AREA_WIDTH / 2))
+	ymin = int(tools.max(0, y - ZOOM_AREA_HEIGHT / 2))
+	ymax = int(tools.min(imgHeight, y + ZOOM_AREA_HEIGHT / 2))
+
+	imgCrop = copy.copy(img[ymin:ymax, xmin:xmax])
+
+	imgCrop = cv.resize(imgCrop, (int(zoomPercent * ZOOM_AREA_WIDTH), int(zoomPercent * ZOOM_AREA_HEIGHT)), interpolation = cv.INTER_CUBIC)
+
+	return imgCrop
+
+def zoomCars(trackImg, cars, best, secondBest, populationRenderer):
+
+	'''
+	zoom around the best car: only the area around it is copied from the track and
+	only the cars close to it are drawn, in track pixels
+	'''
+
+	x, y = best.getPos()
+
+	xmin = int(tools.max(0, x - ZOOM_AREA_WIDTH / 2))
+	xmax = int(tools.min(trackImg.shape[1], x + ZOOM_AREA_WIDTH / 2))
+	ymin = int(tools.max(0, y - ZOOM_AREA_HEIGHT / 2))
+	ymax = int(tools.min(trackImg.shape[0], y + ZOOM_AREA_HEIGHT / 2))
+
+	imgCrop = trackImg[ymin:ymax, xmin:xmax].copy()
+
+	margin = best.CAR_LENGTH + best.SENSOR_DISTANCE
+	near = [c for c in cars if (xmin - margin < c.cx < xmax + margin) and (ymin - margin < c.cy < ymax + margin)]
+
+	populationRenderer.draw(imgCrop, near, best, secondBest, offset = (xmin, ymin))
+
+	return zoom(imgCrop, x - xmin, y - ymin)
+
+def snapshotCar(car):
+
+	'''
+	copy of a car with its own arrays, safe to draw while the original keeps moving
+	'''
+
+	c = copy.copy(car)
+	c.sensors = car.sensors.copy()
+	c.sensorHits = car.sensorHits.copy()
+	c.output = car.output.copy()
+
+	return c
+
+
+class Snapshot:
+
+	'''
+	state of the population after a tick, as drawn by the display loop
+	'''
+
+	def __init__(self, cars, best, secondBest, generation, tick, top = None):
+
+		self.cars = [snapshotCar(c) for c in cars]
+		copies = {id(original): c for original, c in zip(cars, self.cars)}
+
+		self.best = copies.get(id(best))
+		self.secondBest = copies.get(id(secondBest))
+		self.top = None
+
+		if top is not None:
+			self.top = [copies[id(c)] for c in top]
+
+		self.generation = generation
+		self.tick = tick
+
+
+class Display:
+
+	'''
+	windows drawn on the main thread from the snapshots published by the simulation thread
+	'''
+
+	def __init__(self, trackManager, screenSize, populationRenderer, fps = 30, ticksPerFrame = 1, profiler = None, hud = None, exporter = None):
+
+		self.trackManager = trackManager
+		self.trackImg = trackManager.getImage()
+		self.populationRenderer = populationRenderer
+		self.compositor = compositing.Compositor(self.trackImg, compositing.displaySize(self.trackImg, screenSize))
+
+		if profiler is None:
+			profiler = profiling.Profiler()
+
+		self.profiler = profiler
+
+		if hud is None:
+			hud = overlay.Hud()
+
+		self.hud = hud
+		self.exporter = exporter
+
+		self.fps = fps
+		self.ticksPerFrame = ticksPerFrame
+
+		# front snapshot, fresh until the display loop draws it
+		self.lock = threading.Lock()
+		self.front = None
+		self.fresh = False
+
+		self.images = {}
+		self.keys = queue.Queue()
+		self.keyPressed = threading.Event()
+
+		self.ticks = 0
+		self.nextTick = None
+		self.dropped = 0
+		self.frameRate = 0.0
+
+		self.failure = None
+
+	def run(self, simulate):
+		'''
+		to be called on the main thread: shows the track, waits for a key, then runs
+		simulate() on a worker thread and draws its snapshots until it returns
+		an exception raised by simulate is raised again here
+		'''
+
+		self.createWindows()
+
+		cv.imshow('carSim', self.trackManager.showTrack())
+		cv.waitKey(0)
+
+		worker = threading.Thread(target = self.work, args = (simulate,), daemon = True)
+		worker.start()
+
+		self.loop(worker)
+
+		worker.join()
+
+		if self.exporter is not None:
+			self.exporter.close()
+
+		if self.failure is not None:
+			raise self.failure
+
+	def work(self, simulate):
+
+		try:
+			simulate()
+		except BaseException as e:
+			self.failure = e
+
+	# simulation thread
+
+	def publish(self, cars, best, secondBest, generation, tick, top = None):
+		'''
+		to be called after every tick: paces the simulation and hands a snapshot
+		to the display loop when a frame is due
+		'''
+
+		self.ticks += 1
+		self.pace()
+
+		ticksPerFrame = self.ticksPerFrame
+
+		if (ticksPerFrame > 0) and (self.ticks % ticksPerFrame != 0):
+			return
+
+		if self.fresh:
+
+			# the last frame was not drawn yet, this one is dropped
+
+			if ticksPerFrame > 0:
+				self.dropped += 1
+
+			return
+
+		snapshot = Snapshot(cars, best, secondBest, generation, tick, top)
+
+		with self.lock:
+			self.front = snapshot
+			self.fresh = True
+
+	def pace(self):
+		'''
+		sleep to keep the simulation at ticksPerFrame * fps ticks per second
+		'''
+
+		if self.ticksPerFrame == 0:
+			self.nextTick = None
+			return
+
+		now = time.perf_counter()
+
+		# far behind (a slow tick, a generation change): start again from now
+		if (self.nextTick is None) or (now - self.nextTick > 0.1):
+			self.nextTick = now
+
+		self.nextTick += 1.0 / (self.ticksPerFrame * self.fps)
+
+		if self.nextTick > now:
+			time.sleep(self.nextTick - now)
+
+	def takeKey(self):
+		'''
+		next key pressed (upper case), or '' if none
+		'''
+
+		try:
+			return self.keys.get_nowait()
+		except queue.Empty:
+			return ''
+
+	def show(self, window, img):
+		'''
+		show img in window on the next frame
+		'''
+
+		with self.lock:
+			self.images[window] = img
+
+	def wait(self, seconds):
+		'''
+		wait for some seconds or until a key is pressed
+		'''
+
+		self.keyPressed.clear()
+		self.keyPressed.wait(seconds)
+
+	# main thread
+
+	def createWindows(self):
+		cv.namedWindow('carSim')
+		cv.namedWindow('nn')
+		cv.namedWindow('zoom')
+
+		cv.moveWindow('carSim', 0, 0)
+		cv.moveWindow('nn', 700, 0)
+		cv.moveWindow('zoom', 700, 600)
+
+	def loop(self, worker):
+		'''
+		read the keyboard and draw the fresh snapshots as long as the simulation runs
+		'''
+
+		last = time.perf_counter()
+
+		while worker.is_alive():
+			start = time.perf_counter()
+
+			q = cv.waitKey(1) & 0xff
+
+			if q != 0xff:
+				self.handleKey(chr(q).upper())
+
+			with self.lock:
+				snapshot = self.front if self.fresh else None
+				self.fresh = False
+
+				images = self.images
+				self.images = {}
+
+			if snapshot is not None:
+				self.drawFrame(snapshot)
+
+				now = time.perf_counter()
+				self.frameRate = 0.9 * self.frameRate + 0.1 / max(now - last, 1e-6)
+				last = now
+
+			for window, img in images.items():
+				cv.imshow(window, img)
+
+			elapsed = time.perf_counter() - start
+
+			if elapsed < 1.0 / self.fps:
+				time.sleep(1.0 / self.fps - elapsed)
+
+	def handleKey(self, key):
+		'''
+		'+' and '-' change the ticks per frame here, every other key goes to the simulation
+		'''
+
+		if key in ('+', '='):
+			if self.ticksPerFrame > 0:
+				self.ticksPerFrame *= 2
+
+				if self.ticksPerFrame > MAX_TICKS_PER_FRAME:
+					self.ticksPerFrame = 0
+		elif key in ('-', '_'):
+			if self.ticksPerFrame == 0:
+				self.ticksPerFrame = MAX_TICKS_PER_FRAME
+			elif self.ticksPerFrame > 1:
+				self.ticksPerFrame //= 2
+		else:
+			self.keys.put(key)
+
+		self.keyPressed.set()
+
+	def drawFrame(self, snapshot):
+		'''
+		restore what the last frame touched, draw the snapshot in display pixels
+		'''
+
+		with self.profiler.span('restore'):
+			frame = self.compositor.restore()
+
+		with self.profiler.span('draw'):
+			self.compositor.mark(self.populationRenderer.draw(frame, snapshot.cars, snapshot.best, snapshot.secondBest, self.compositor.scale, top = snapshot.top))
+
+		if snapshot.best is not None:
+			with self.profiler.span('zoom'):
+				zoomImg = zoomCars(self.trackImg, snapshot.cars, snapshot.best, snapshot.secondBest, self.populationRenderer)
+				cv.imshow('zoom', zoomImg)
+
+			if (self.exporter is not None) and (self.exporter.view == 'zoom'):
+				with self.profiler.span('export'):
+					self.exporter.push(zoomImg)
+
+		# the stats panel is only rendered a few times per second, blended every frame
+
+		if self.hud.due():
+			with self.profiler.span('hud.render'):
+				self.hud.render(snapshot, self.trackManager, self.speedText())
+
+		with self.profiler.span('hud.draw'):
+			self.compositor.mark(self.hud.draw(frame, 10, 10))
+
+		with self.profiler.span('imshow'):
+			cv.imshow('carSim', frame)
+
+		if (self.exporter is not None) and (self.exporter.view == 'track'):
+			with self.profiler.span('export'):
+				self.exporter.push(frame)
+
+	def speedText(self):
+		'''
+		ticks per frame, frame rate and dropped frames
+		'''
+
+		if self.ticksPerFrame > 0:
+			text = "x%d ticks/frame" %(self.ticksPerFrame)
+		else:
+			text = "max ticks/frame"
+
+		return text + "  %.0f fps  %d dropped" %(self.frameRate, self.dropped)
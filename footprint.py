@@ -0,0 +1,112 @@
+import numpy as np
+import cv2 as cv
+import math
+import car
+
+'''
+car footprint collision
+
+the car rectangle (CAR_WIDTH x CAR_LENGTH) is rasterized once for a few quantized
+headings, each one kept as the pixel offsets it covers around the car centre; a
+collision check is then a lookup of those pixels in the occupancy grid of the
+track (True where there is a wall), for every car at once
+
+unlike the front sensors this also sees the sides and the back of the car
+'''
+
+HEADINGS = 64
+
+
+class Footprint:
+
+	'''
+	rotated car masks, as pixel offsets per quantized heading
+	'''
+
+	def __init__(self, width = car.Car.CAR_WIDTH, length = car.Car.CAR_LENGTH, headings = HEADINGS):
+
+		self.headings = headings
+
+		# big enough canvas for any rotation, the car centre in the middle
+		size = int(math.ceil(math.hypot(width, length))) + 3
+		centre = size // 2
+
+		corners = np.array([[-width / 2, length / 2], [width / 2, length / 2], [width / 2, -length / 2], [-width / 2, -length / 2]])
+		masks = []
+
+		for i in range(headings):
+			angle = 2 * math.pi * i / headings
+			cos = math.cos(angle)
+			sin = math.sin(angle)
+
+			# same rotation as tools.rotate
+			x = corners[:, 0] * cos - corners[:, 1] * sin + centre
+			y = corners[:, 0] * sin + corners[:, 1] * cos + centre
+
+			canvas = np.zeros((size, size), dtype = np.uint8)
+			cv.fillPoly(canvas, [np.round(np.column_stack((x, y))).astype(np.int32)], 1)
+
+			ys, xs = np.nonzero(canvas)
+			masks.append(np.column_stack((xs - centre, ys - centre)))
+
+		# one (headings, M, 2) array, shorter masks padded with their first pixel
+		m = max(len(mask) for mask in masks)
+
+		self.offsets = np.array([np.vstack((mask, np.repeat(mask[:1], m - len(mask), axis = 0))) for mask in masks], dtype = np.int64)
+		self.margin = centre + 1
+
+		# id of an occupancy grid -> (the grid, its padded copy flattened, mask offsets as flat indices)
+		self.grids = {}
+
+	def grid(self, occupancy):
+		'''
+		occupancy with a wall border as wide as a mask, flattened: every footprint
+		then falls inside it and one flat index per pixel is enough
+		'''
+
+		key = id(occupancy)
+
+		if key not in self.grids:
+			padded = np.pad(occupancy, self.margin, constant_values = True)
+			offsets = self.offsets[:, :, 1] * padded.shape[1] + self.offsets[:, :, 0]
+
+			# the grid is kept too, so its id is not reused
+			self.grids[key] = (occupancy, padded.ravel(), offsets)
+
+		return self.grids[key]
+
+	def collide(self, cars, occupancy):
+		'''
+		(N,) True for every car whose footprint touches a wall or leaves the track image
+		'''
+
+		if len(cars) == 0:
+			return np.zeros(0, dtype = bool)
+
+		pose = np.array([[c.cx, c.cy, c.steer] for c in cars], dtype = np.float64)
+
+		h, w = occupancy.shape
+		occupancy, flat, offsets = self.grid(occupancy)
+
+		index = np.round(pose[:, 2] * self.headings / (2 * math.pi)).astype(np.int64) % self.headings
+
+		# centres in padded coordinates, a car far off the track lands on the border
+		x = np.clip(np.rint(pose[:, 0]).astype(np.int64) + self.margin, 0, w + 2 * self.margin - 1)
+		y = np.clip(np.rint(pose[:, 1]).astype(np.int64) + self.margin, 0, h + 2 * self.margin - 1)
+
+		# pixels past the border only happen for cars off the track, already hitting it
+		pixels = np.clip((y * (w + 2 * self.margin) + x)[:, None] + offsets[index], 0, len(flat) - 1)
+
+		return np.any(flat[pixels], axis = 1)
+
+	def kill(self, cars, occupancy):
+		'''
+		the cars colliding die, returns how many
+		'''
+
+		hit = self.collide(cars, occupancy)
+
+		for i in np.flatnonzero(hit):
+			cars[i].alive = False
+
+		return int(np.sum(hit))
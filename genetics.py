@@ -1,7 +1,7 @@
-import numpy as np
 import car
 import math
 import sys
+import randomstreams
 
 '''
 evolution of species
@@ -10,28 +10,32 @@ two parents create a new entire population
 get the pair and swap some genes from these two and create a new pair with some mutations
 '''
 
-def mutateGenotype(genes, mutationGenotypeProbability = 1.0):
+def mutateGenotype(genes, mutationGenotypeProbability = 1.0, rng = None):
 
 	'''
 	do we need to mutate this genotype?
 	'''
 
-	if (np.random.random() < mutationGenotypeProbability):
-		mutateGenes(genes)
+	rng = randomstreams.generator(rng)
 
-def mutateGenes(genes,  mutationGeneProbability = 0.3, mutationGeneAmount = 2.0):
+	if (rng.random() < mutationGenotypeProbability):
+		mutateGenes(genes, rng = rng)
+
+def mutateGenes(genes,  mutationGeneProbability = 0.3, mutationGeneAmount = 2.0, rng = None):
 
 	'''
 	apply some randomness to each gene from the genotype
 	'''
 
+	rng = randomstreams.generator(rng)
+
 	for i in range(len(genes)):
-		if (np.random.random() < mutationGeneProbability):
-			genes[i] += (np.random.random() * mutationGeneAmount * 2) - mutationGeneAmount
+		if (rng.random() < mutationGeneProbability):
+			genes[i] += (rng.random() * mutationGeneAmount * 2) - mutationGeneAmount
 
 
 
-def crossOver(genes1, genes2, crossOverProbability = 0.6):
+def crossOver(genes1, genes2, crossOverProbability = 0.6, rng = None):
 
 	'''
 	swap i-gene from both genotypes
@@ -41,36 +45,51 @@ def crossOver(genes1, genes2, crossOverProbability = 0.6):
 		print("genes dimension must match")
 		sys.exit(-1)
 
+	rng = randomstreams.generator(rng)
+
 	for i in range(len(genes1)):
-		if (np.random.random() < crossOverProbability):
+		if (rng.random() < crossOverProbability):
 			q = genes1[i]
 			genes1[i] = genes2[i]
 			genes2[i] = q
 
 
 
-def crossOverAndMutation(agent1, agent2, numchildren):
+def crossOverAndMutation(agent1, agent2, numchildren, rng = None):
 
 	''' 
 	create a new population based on agents 1 and 2
 	'''
 
-	children = []
-
 	if (agent1 is None) or (agent2 is None):
 		print("expecting both agents for the new generation")
 		sys.exit(-1)
 
+	return crossOverAndMutationGenotypes(agent1.getGenotype(), agent2.getGenotype(), numchildren, rng)
+
+def crossOverAndMutationGenotypes(genotype1, genotype2, numchildren, rng = None):
+
+	'''
+	create a new population based on genotypes 1 and 2
+	parents are not modified, every pair of children starts from a fresh copy
+	'''
+
+	children = []
+
+	if (genotype1 is None) or (genotype2 is None):
+		print("expecting both genotypes for the new generation")
+		sys.exit(-1)
+
 	while (numchildren > 0):
 
 		# get data from both parents
-		w1 = agent1.getGenotype()
-		w2 = agent2.getGenotype()
+		w1 = list(genotype1)
+		w2 = list(genotype2)
 
 		# how will its children look?
-		crossOver(w1, w2)
-		mutateGenotype(w1)
-		mutateGenotype(w2)
+		crossOver(w1, w2, rng = rng)
+		mutateGenotype(w1, rng = rng)
+		mutateGenotype(w2, rng = rng)
 
 		# create
 		children.append(w1)
@@ -84,9 +103,10 @@ def crossOverAndMutation(agent1, agent2, numchildren):
 
 	return children
 
-def randomRecombination(genotypes, genotype1, genotype2, numchildren):
+def randomRecombination(genotypes, genotype1, genotype2, numchildren, rng = None):
 	
 	children = []
+	rng = randomstreams.generator(rng)
 
 	if (genotype1 is None) or (genotype2 is None):
 		print("expecting both agents for the new generation")
@@ -103,18 +123,18 @@ def randomRecombination(genotypes, genotype1, genotype2, numchildren):
 
 	while (numchildren > 0):
 
-		i1 = np.random.randint(0, len(genotypes))
+		i1 = rng.integers(0, len(genotypes))
 		i2 = i1
 
 		while i2 == i1:
-			i2 = np.random.randint(0, len(genotypes))
+			i2 = rng.integers(0, len(genotypes))
 
 		w1 = genotypes[i1].getGenotype()
 		w2 = genotypes[i2].getGenotype()
 
-		crossOver(w1, w2)
-		mutateGenotype(w1)
-		mutateGenotype(w2)
+		crossOver(w1, w2, rng = rng)
+		mutateGenotype(w1, rng = rng)
+		mutateGenotype(w2, rng = rng)
 
 		children.append(w1)
 		numchildren -= 1
@@ -129,32 +149,89 @@ def randomRecombination(genotypes, genotype1, genotype2, numchildren):
 
 
 
-def createCars(numgenotypes = 10, oldgenotypes = None, agent1 = None, agent2 = None):
+def seedGenotypes(hallOfFame, numgenotypes, rng = None):
+
+	'''
+	a new population from a hall of fame: the best genotypes as they are,
+	the rest bred from consecutive pairs of them
+	'''
+
+	if len(hallOfFame) == 0:
+		print("expecting at least one genotype in the hall of fame")
+		sys.exit(-1)
+
+	children = [list(w) for w in hallOfFame[:numgenotypes]]
+
+	k = 0
+
+	while len(children) < numgenotypes:
+		w1 = hallOfFame[k % len(hallOfFame)]
+		w2 = hallOfFame[(k + 1) % len(hallOfFame)]
+		children += crossOverAndMutationGenotypes(w1, w2, min(2, numgenotypes - len(children)), rng)
+		k += 1
+
+	return children
+
+def createCars(numgenotypes = 10, oldgenotypes = None, agent1 = None, agent2 = None, hallOfFame = None, rng = None):
 	
 	genotypes = []
+	rng = randomstreams.generator(rng)
 
 	if (numgenotypes < 2):
 		print("new generation must contain at least 2")
 		sys.exit(-1)
 
+	if hallOfFame is not None:
+
+		# warm start from the best ones of past runs
+
+		return createCarsFromGenotypes(seedGenotypes(hallOfFame, numgenotypes, rng), [rng] * numgenotypes)
+
 	if (agent1 is None) and (agent2 is None) and (oldgenotypes is None):
 		
 		# create cars random
 
 		for i in range(numgenotypes):
-			newcar = car.Car(steer = -np.random.random() * math.pi)	
+			newcar = car.Car(steer = -rng.random() * math.pi, rng = rng)	
 			genotypes.append(newcar)
 
 	else:
 
-		w = crossOverAndMutation(agent1, agent2, numchildren = numgenotypes)
+		w = crossOverAndMutation(agent1, agent2, numchildren = numgenotypes, rng = rng)
 
 		#w = randomRecombination(oldgenotypes, agent1, agent2, numgenotypes)
 
 		for i in range(numgenotypes):
-			newcar = car.Car(steer = -np.random.random() * math.pi)	
+			newcar = car.Car(steer = -rng.random() * math.pi, rng = rng)	
 			newcar.setGenotype(w[i])
 			genotypes.append(newcar)
 
 
-	return genotypes
\ No newline at end of file
+	return genotypes
+
+def genotypeDimension():
+
+	'''
+	number of genes of a car genotype
+	'''
+
+	return car.Car().getGenotypeDimension()
+
+def createCarsFromGenotypes(genotypes, rngs = None):
+
+	'''
+	create one car per given genotype (any sequence of genes, a genome matrix row is fine)
+	rngs gives the random stream of every car (see randomstreams.RandomStreams.cars)
+	'''
+
+	cars = []
+
+	if rngs is None:
+		rngs = [randomstreams.generator()] * len(genotypes)
+
+	for w, rng in zip(genotypes, rngs):
+		newcar = car.Car(steer = -rng.random() * math.pi, rng = rng)
+		newcar.setGenotype(w)
+		cars.append(newcar)
+
+	return cars
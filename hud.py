@@ -0,0 +1,130 @@
+import numpy as np
+import cv2 as cv
+import time
+
+'''
+stats overlay
+
+the stats panel (a few counters and the data of the top K cars) is rendered into a
+cached image a few times per second only; every frame just blends that image onto
+the track, so text rendering does not cost anything per tick nor per car
+'''
+
+
+class Hud:
+
+	'''
+	stats panel re-rendered at rate Hz, alpha-blended on every frame
+	'''
+
+	BACKGROUND_COLOR = (255, 255, 255)
+	BACKGROUND_ALPHA = 0.6			# text is opaque, the panel background see-through
+	MARGIN = 4
+	MAX_WIDTH = 640
+
+	def __init__(self, topK = 3, rate = 5.0):
+
+		self.topK = topK
+		self.rate = rate
+
+		self.panel = None			# premultiplied by its alpha
+		self.alpha = None			# 1 - alpha, what is kept from the frame
+		self.renderedAt = None
+
+	def due(self):
+		'''
+		is it time to render the panel again?
+		'''
+
+		return (self.renderedAt is None) or (time.perf_counter() - self.renderedAt >= 1.0 / self.rate)
+
+	def topCars(self, cars, best, secondBest, ranked = None):
+		'''
+		best, second best and the most advanced alive cars, topK at most
+		(the first of ranked if the cars are already ranked)
+		'''
+
+		if ranked is not None:
+			return ranked[:self.topK]
+
+		top = [c for c in (best, secondBest) if c is not None]
+
+		alive = [c for c in cars if c.isAlive() and (c is not best) and (c is not secondBest)]
+		k = self.topK - len(top)
+
+		if (k > 0) and (len(alive) > 0):
+			completion = np.array([c.completion() for c in alive])
+			index = np.argsort(-completion, kind = 'stable')[:k]
+			top += [alive[i] for i in index]
+
+		return top[:self.topK]
+
+	def render(self, snapshot, trackManager, status = ""):
+		'''
+		render the panel of a snapshot into the cached overlay
+		'''
+
+		tm = trackManager
+		cars = snapshot.cars
+		completion = np.array([c.completion() for c in cars])
+		alive = np.array([c.isAlive() for c in cars])
+		culled = sum(1 for c in cars if c.isCulled())
+
+		lines = ["G=%d T=%d ALIVE=%d/%d CULLED=%d" %(snapshot.generation, snapshot.tick, np.sum(alive), len(cars), culled)]
+		lines.append("BEST=%.1f%% MEAN=%.1f%% MEAN ALIVE=%.1f%%" %(100 * np.max(completion), 100 * np.mean(completion), 100 * np.mean(completion[alive]) if np.any(alive) else 0.0))
+
+		if status != "":
+			lines.append(status)
+
+		top = self.topCars(cars, snapshot.best, snapshot.secondBest, snapshot.top)
+
+		height = 2 * self.MARGIN + tm.fontSize * (len(lines) + 5 * len(top) + 1)
+		panel = np.full((height, self.MAX_WIDTH, 3), self.BACKGROUND_COLOR, dtype = np.uint8)
+
+		x = self.MARGIN
+		y = self.MARGIN + tm.fontSize
+		width = 0
+
+		for text in lines:
+			cv.putText(panel, text, (x, y), tm.font, tm.FONT_SCALE, tm.FONT_COLOR, 1, tm.fontAA)
+			width = max(width, cv.getTextSize(text, tm.font, tm.FONT_SCALE, 1)[0][0])
+			y += tm.fontSize
+
+		for c in top:
+			y += tm.fontSize // 2
+			w, h = tm.printData(panel, c, x, y)
+			width = max(width, w)
+			y += h
+
+		# y is the baseline of the next line, crop below the last one
+		panel = panel[:y - tm.fontSize + 2 * self.MARGIN, :min(self.MAX_WIDTH, width + 2 * self.MARGIN)]
+
+		# opaque where something was written
+		written = np.any(panel != np.array(self.BACKGROUND_COLOR, dtype = np.uint8), axis = 2)
+
+		alpha = np.where(written, 1.0, self.BACKGROUND_ALPHA).astype(np.float32)[:, :, None]
+
+		# premultiplied, blending is then one multiply and one add per pixel
+		self.panel = panel.astype(np.float32) * alpha
+		self.alpha = 1 - alpha
+		self.renderedAt = time.perf_counter()
+
+	def draw(self, img, x, y):
+		'''
+		blend the cached panel onto img at (x, y), returns the box x0, y0, x1, y1 it covers
+		'''
+
+		if self.panel is None:
+			return np.zeros((0, 4), dtype = int)
+
+		h = min(self.panel.shape[0], img.shape[0] - y)
+		w = min(self.panel.shape[1], img.shape[1] - x)
+
+		if (h <= 0) or (w <= 0):
+			return np.zeros((0, 4), dtype = int)
+
+		roi = img[y:y + h, x:x + w]
+
+		roi[:] = self.panel[:h, :w] + roi * self.alpha[:h, :w]
+
+		return x, y, x + w - 1, y + h - 1
@@ -0,0 +1,97 @@
+import numpy as np
+
+'''
+top K cars of a generation
+
+completions are kept in a vector: after every tick only the live cars are read
+again (dead cars keep their final completion) and the top K is found with
+np.argpartition; best and second best colours are only changed when they change
+'''
+
+
+class Leaderboard:
+
+	'''
+	incremental ranking of a population by completion
+	'''
+
+	def __init__(self, k = 10):
+
+		self.k = max(k, 2)
+		self.reset([])
+
+	def reset(self, cars):
+		'''
+		start ranking a new population
+		'''
+
+		self.cars = cars
+		self.index = {id(car): i for i, car in enumerate(cars)}
+		self.completion = np.array([car.completion() for car in cars], dtype = float)
+
+		self.top = []
+		self.best = None
+		self.secondBest = None
+
+	def update(self, active):
+		'''
+		read the completion of the active cars, returns best and second best
+		'''
+
+		# cars not ranked (other tracks of a track set) are skipped
+
+		for car in active:
+			i = self.index.get(id(car))
+
+			if i is not None:
+				self.completion[i] = car.completion()
+
+		n = len(self.cars)
+
+		if n == 0:
+			return None, None
+
+		k = min(self.k, n)
+
+		if k < n:
+			candidates = np.argpartition(-self.completion, k - 1)[:k]
+		else:
+			candidates = np.arange(n)
+
+		# highest completion first, lowest index first among equals (like TrackManager.bestCar)
+		order = candidates[np.lexsort((candidates, -self.completion[candidates]))]
+
+		self.top = [self.cars[i] for i in order]
+		self.recolor(self.top[0], self.top[1] if n > 1 else None)
+
+		return self.best, self.secondBest
+
+	def recolor(self, best, secondBest):
+		'''
+		move the best and second best colours, only if the ranking changed
+		'''
+
+		if (best is self.best) and (secondBest is self.secondBest):
+			return
+
+		for car in (self.best, self.secondBest):
+			if car is not None:
+				car.setNormalColor()
+
+		best.setBestColor()
+
+		if secondBest is not None:
+			secondBest.setSecondBestColor()
+
+		self.best = best
+		self.secondBest = secondBest
+
+	def getTop(self, k = None):
+		'''
+		the k best cars (all the top kept if k is None), best first
+		'''
+
+		if k is None:
+			return self.top
+
+		return self.top[:k]
@@ -0,0 +1,336 @@
+import numpy as np
+import collections
+import os
+import sys
+
+'''
+lineage archive
+
+every generation is appended to one file: ids, parent ids, fitness and the genomes
+stored as deltas from their parents
+
+a child is described by its two parents of the previous generation (the ones it shares
+most genes with), one bit per gene telling which parent the gene comes from, and a
+sparse patch with the genes that match neither parent (mutations)
+
+when there are no parents close enough (cma-es samples, long delta chains) the full
+genome is stored as a keyframe, so rebuilding a genome never walks more than
+KEYFRAME_DEPTH generations
+
+a delta is only written when it takes less room than the genome; a generation with no
+delta worth its bookkeeping (cma-es samples without quantization) is written as a
+keyframe chunk holding only the fitness and the genomes
+
+with quantize = True the patches are float16 deltas against the rebuilt first parent,
+the error stays below one float16 step and does not accumulate along the lineage
+'''
+
+KEYFRAME_DEPTH = 32
+CACHE_SIZE = 4096
+
+# ids are consecutive from the header first id, keyframes are the genomes without parents
+CHUNK_ARRAYS = ['parents', 'fitness', 'masks', 'offsets', 'indices', 'values', 'keyframes']
+KEYFRAME_ARRAYS = ['fitness', 'keyframes']
+
+# bytes of the arrays a delta chunk writes on top of a keyframe chunk (npy headers)
+DELTA_CHUNK_OVERHEAD = 5 * 128
+
+
+def keyframeChunk(fitness, keyframes, quantize):
+
+	'''
+	chunk of a generation stored without deltas, every genome a keyframe
+	'''
+
+	n, d = keyframes.shape
+
+	return {'parents': np.full((2, n), -1, dtype = np.int64), 'fitness': fitness,
+		'masks': np.zeros((0, (d + 7) // 8), dtype = np.uint8), 'offsets': np.zeros(1, dtype = np.int64),
+		'indices': np.zeros(0, dtype = np.uint16), 'values': np.zeros(0, dtype = np.float16 if quantize else np.float64),
+		'keyframes': keyframes}
+
+
+class LineageArchive:
+
+	'''
+	append-only genome archive with a fitness index over all its history
+	'''
+
+	def __init__(self, filename, quantize = False):
+
+		self.filename = filename
+		self.quantize = quantize
+
+		self.generation = 0
+		self.dimension = None
+
+		# per genome index
+		self.parents = np.zeros(0, dtype = np.int64)
+		self.parents2 = np.zeros(0, dtype = np.int64)
+		self.fitness = np.zeros(0)
+		self.depth = np.zeros(0, dtype = np.int64)
+		self.chunkOf = np.zeros(0, dtype = np.int64)
+		self.rowOf = np.zeros(0, dtype = np.int64)
+
+		# per generation chunks
+		self.chunks = []
+
+		self.cache = collections.OrderedDict()
+
+		self.lastIds = None
+		self.lastGenomes = None
+
+		if os.path.exists(filename):
+			self.read()
+
+	def size(self):
+		return len(self.fitness)
+
+	def read(self):
+		'''
+		load the index of an existing archive, chunk after chunk
+		'''
+
+		with open(self.filename, 'rb') as f:
+
+			end = os.fstat(f.fileno()).st_size
+
+			while f.tell() < end:
+				header = np.load(f)
+				chunk = {}
+
+				# archives written before keyframe chunks have a 4 entries header
+				keyframesOnly = (len(header) > 4) and bool(header[4])
+
+				for name in (KEYFRAME_ARRAYS if keyframesOnly else CHUNK_ARRAYS):
+					chunk[name] = np.load(f)
+
+				if keyframesOnly:
+					chunk = keyframeChunk(chunk['fitness'], chunk['keyframes'], bool(header[2]))
+
+				chunk['quantized'] = bool(header[2])
+				chunk['ids'] = np.arange(header[3], header[3] + len(chunk['fitness']), dtype = np.int64)
+				chunk['full'] = chunk['parents'][0] < 0
+
+				self.generation = int(header[0]) + 1
+				self.dimension = int(header[1])
+				self.index(chunk)
+
+		if self.size() > 0:
+			self.lastIds = self.chunks[-1]['ids']
+			self.lastGenomes = np.array([self.genome(i) for i in self.lastIds])
+
+	def index(self, chunk):
+
+		n = len(chunk['ids'])
+		self.chunks.append(chunk)
+
+		# keyframe row of every full genome, delta row of the others
+		chunk['row'] = np.where(chunk['full'], np.cumsum(chunk['full']) - 1, np.cumsum(~chunk['full']) - 1)
+
+		depth = np.zeros(n, dtype = np.int64)
+		delta = ~chunk['full']
+		depth[delta] = np.maximum(self.depth[chunk['parents'][0, delta]], self.depth[chunk['parents'][1, delta]]) + 1
+
+		self.parents = np.concatenate((self.parents, chunk['parents'][0]))
+		self.parents2 = np.concatenate((self.parents2, chunk['parents'][1]))
+		self.fitness = np.concatenate((self.fitness, chunk['fitness']))
+		self.depth = np.concatenate((self.depth, depth))
+		self.chunkOf = np.concatenate((self.chunkOf, np.full(n, len(self.chunks) - 1, dtype = np.int64)))
+		self.rowOf = np.concatenate((self.rowOf, np.arange(n, dtype = np.int64)))
+
+	def findParents(self, genomes):
+		'''
+		rows of the previous generation sharing most genes with every genome (first parent)
+		and most of the remaining genes (second parent), plus the genes matching neither
+		'''
+
+		n = genomes.shape[0]
+		p = self.lastGenomes.shape[0]
+
+		shared = np.zeros((n, p), dtype = np.int64)
+
+		for j in range(p):
+			shared[:, j] = np.sum(genomes == self.lastGenomes[j], axis = 1)
+
+		first = np.argmax(shared, axis = 1)
+		fromFirst = genomes == self.lastGenomes[first]
+
+		shared2 = np.zeros((n, p), dtype = np.int64)
+
+		for j in range(p):
+			shared2[:, j] = np.sum((genomes == self.lastGenomes[j]) & ~fromFirst, axis = 1)
+
+		second = np.argmax(shared2, axis = 1)
+		fromSecond = (genomes == self.lastGenomes[second]) & ~fromFirst
+
+		return first, second, fromSecond, ~(fromFirst | fromSecond)
+
+	def append(self, genomes, fitness):
+		'''
+		add one generation, returns the ids given to its genomes
+		'''
+
+		genomes = np.asarray(genomes, dtype = np.float64)
+		fitness = np.asarray(fitness, dtype = np.float64)
+		n, d = genomes.shape
+
+		if self.dimension is None:
+			self.dimension = d
+		elif self.dimension != d:
+			print("genome dimension does not match the lineage archive")
+			sys.exit(-1)
+
+		ids = np.arange(self.size(), self.size() + n, dtype = np.int64)
+		stored = genomes.copy()
+
+		parents = np.full(n, -1, dtype = np.int64)
+		parents2 = np.full(n, -1, dtype = np.int64)
+		full = np.ones(n, dtype = bool)
+		masks = np.zeros((0, (d + 7) // 8), dtype = np.uint8)
+		offsets = np.zeros(1, dtype = np.int64)
+		indices = np.zeros(0, dtype = np.uint16)
+		values = np.zeros(0, dtype = np.float16 if self.quantize else np.float64)
+
+		if self.lastGenomes is not None:
+
+			first, second, fromSecond, patched = self.findParents(genomes)
+
+			# a delta is worth it when mask, offset and patches take less than the full genome,
+			# and the deltas of a generation together must pay for the arrays they add
+
+			valueBytes = 2 if self.quantize else 8
+			cost = masks.shape[1] + 8 + np.sum(patched, axis = 1) * (2 + valueBytes)
+
+			parents = self.lastIds[first]
+			parents2 = self.lastIds[second]
+			full = (cost >= d * 8) | (np.maximum(self.depth[parents], self.depth[parents2]) >= KEYFRAME_DEPTH)
+
+			if np.sum(d * 8 - cost[~full]) <= DELTA_CHUNK_OVERHEAD:
+				full[:] = True
+
+			rows = np.flatnonzero(~full)
+			masks = np.packbits(fromSecond[rows], axis = 1)
+
+			offsets = np.concatenate(([0], np.cumsum(np.sum(patched[rows], axis = 1))))
+			indices = np.flatnonzero(patched[rows]) % d
+			indices = indices.astype(np.uint16)
+
+			if self.quantize:
+
+				# closed loop, deltas against the rebuilt parents
+
+				values = []
+
+				for r in range(len(rows)):
+					i = rows[r]
+					base = np.where(fromSecond[i], self.genome(parents2[i]), self.genome(parents[i]))
+					delta = (genomes[i] - base)[patched[i]].astype(np.float16)
+					base[patched[i]] += delta
+					stored[i] = base
+					values.append(delta)
+
+				values = np.concatenate(values) if values else np.zeros(0, dtype = np.float16)
+			else:
+				values = genomes[rows][patched[rows]]
+
+			parents[full] = -1
+			parents2[full] = -1
+
+		keyframesOnly = bool(np.all(full))
+
+		if keyframesOnly:
+			chunk = keyframeChunk(fitness, genomes, self.quantize)
+		else:
+			chunk = {'parents': np.vstack((parents, parents2)), 'fitness': fitness, 'masks': masks,
+				'offsets': offsets, 'indices': indices, 'values': values, 'keyframes': genomes[full]}
+
+		with open(self.filename, 'ab') as f:
+			np.save(f, np.array([self.generation, d, self.quantize, ids[0], keyframesOnly], dtype = np.int64))
+
+			for name in (KEYFRAME_ARRAYS if keyframesOnly else CHUNK_ARRAYS):
+				np.save(f, chunk[name])
+
+		chunk['quantized'] = self.quantize
+		chunk['ids'] = ids
+		chunk['full'] = full
+
+		self.index(chunk)
+		self.generation += 1
+
+		for i in range(n):
+			self.remember(ids[i], stored[i])
+
+		self.lastIds = ids
+		self.lastGenomes = genomes
+
+		return ids
+
+	def remember(self, i, genome):
+
+		self.cache[int(i)] = genome
+		self.cache.move_to_end(int(i))
+
+		while len(self.cache) > CACHE_SIZE:
+			self.cache.popitem(last = False)
+
+	def genome(self, i):
+		'''
+		rebuild the genome of a given id
+		'''
+
+		i = int(i)
+
+		if i in self.cache:
+			self.cache.move_to_end(i)
+			return self.cache[i].copy()
+
+		chunk = self.chunks[self.chunkOf[i]]
+		row = chunk['row'][self.rowOf[i]]
+
+		if chunk['full'][self.rowOf[i]]:
+			genome = chunk['keyframes'][row].copy()
+		else:
+			# parents are at most KEYFRAME_DEPTH generations away from a keyframe
+
+			parent1 = self.genome(self.parents[i])
+			parent2 = self.genome(self.parents2[i])
+
+			fromSecond = np.unpackbits(chunk['masks'][row], count = self.dimension).astype(bool)
+			genome = np.where(fromSecond, parent2, parent1)
+
+			start, end = chunk['offsets'][row], chunk['offsets'][row + 1]
+			patched = chunk['indices'][start:end]
+
+			if chunk['quantized']:
+				genome[patched] += chunk['values'][start:end]
+			else:
+				genome[patched] = chunk['values'][start:end]
+
+		self.remember(i, genome)
+
+		return genome.copy()
+
+	def top(self, k):
+		'''
+		ids and fitness of the k best genomes of all history, best first
+		'''
+
+		k = min(k, self.size())
+
+		if k == 0:
+			return np.zeros(0, dtype = np.int64), np.zeros(0)
+
+		best = np.argpartition(-self.fitness, k - 1)[:k]
+		best = best[np.argsort(-self.fitness[best], kind = 'stable')]
+
+		return best, self.fitness[best]
+
+	def hallOfFame(self, k):
+		'''
+		(k, dimension) genome matrix of the k best genomes of all history
+		'''
+
+		ids, fitness = self.top(k)
+
+		return np.array([self.genome(i) for i in ids])
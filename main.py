@@ -1,273 +1,485 @@
 #!/usr/bin/python
 
 import math
-import random
 import numpy as np
-import cv2 as cv
-import copy
 import car
 import sys
-import tracks
-import tools
 import time
 import genetics
+import optimizers
+import racing
+import pareto
+import novelty
+import checkpoint
+import lineage
+import recorder
+import randomstreams
+import simulation
+import profiler as profiling
+import metrics
+import renderer
+import display as displaying
+import hud as overlay
+import videoexport
+import leaderboard as ranking
+import trackset
+import curriculum as curricula
+import argparse
+
+TRACK_FILE = "tracks/track1_wp.png"
+
+# used when the screen size cannot be read (no screeninfo, no monitor)
+DEFAULT_SCREEN_SIZE = (1280, 720)
 
-import screeninfo
 
 
+def showNeuronWeights(best, secondBest):
+	'''
+	creates an img with the representation of the best two neural networks
+	'''
 
+	imgNeuron = np.full((500, 500, 3), (255, 255, 255), dtype = np.uint8)				
 
-def sleep(timer):
+	if best is not None:
+		best.nn.graph(imgNeuron, 0)
 
-	timeout = time.time() + timer
+	if secondBest is not None:
+		secondBest.nn.graph(imgNeuron, 250)
 
-	while (time.time() < timeout):
-		if (cv.waitKey(1) != -1): break
+	return imgNeuron
 
-def printStats(img, x, y, trackManager, cars, best, secondbest):
+def printParetoFront(objectives):
 
 	'''
-	prints car stats in given img
+	prints the objectives of the non-dominated cars, see pareto.carObjectives
 	'''
 
-	k = 0
-
-	if best is not None:
-		trackManager.printData(img, best, x, y + k * 100)
-		k +=1
-
-	if secondbest is not None:
-		trackManager.printData(img, secondbest, x, y + k * 100)
-		k +=1
+	print("pareto front (%d cars)" %(len(objectives)))
 
-	for car in cars:
-		if car.isAlive():
-			if car != best and car != secondbest:
-				trackManager.printData(img, car, x, y + k * 100)
-				k += 1
+	for o in objectives[np.argsort(objectives[:, 0])]:
+		print("  C=%.1f%% T/C=%.1fs ODO/C=%.0f" %(-100.0 * o[0], o[1], o[2]))
 
-def showNeuronWeights(best, secondBest):
+def getScreenSize():
 	'''
-	creates an img with the representation of the best two neural networks
+	get screen size from monitor placed at x=0
 	'''
 
-	imgNeuron = np.full((500, 500, 3), (255, 255, 255), dtype = np.uint8)				
+	# screeninfo is only needed here, the simulation itself runs without it
 
-	if best is not None:
-		best.nn.graph(imgNeuron, 0)
+	try:
+		import screeninfo
 
-	if secondBest is not None:
-		secondBest.nn.graph(imgNeuron, 250)
+		for m in screeninfo.get_monitors():
+			if (m.x == 0):
+				return m.width, m.height
+	except Exception:
+		pass
 
-	return imgNeuron
+	print("cannot capture screen size, using %dx%d" %(DEFAULT_SCREEN_SIZE))
 
-def zoom(img, x, y, zoomPercent = 2.0):
-	
-	'''
-	creates an img with the zoomed portion of img around (x,y) position
-	'''
+	return DEFAULT_SCREEN_SIZE
 
-	ZOOM_AREA_WIDTH = 100
-	ZOOM_AREA_HEIGHT = 100
+def main(numgenerations = 100, genotypesPerGeneration = 10, optimizerName = 'ga', racer = None, multiObjective = False, noveltySearch = None, checkpointer = None, resumeState = None, lineageArchive = None, hallOfFame = None, trajectoryRecorder = None, streams = None, profiler = None, metricsWriter = None, populationRenderer = None, fps = 30, ticksPerFrame = 1, dt = 1 / 30.0, hud = None, exporter = None, trackSet = None, substeps = 1, collision = 'sensors', curriculum = None):
 
-	imgWidth = img.shape[1]
-	imgHeight = img.shape[0]
+	screenSize = getScreenSize()
 
-	imgZoom = np.full((200, 200, 3), (255, 255, 255), dtype = np.uint8)
+	# the first track is the one shown, the others are only simulated
 
-	xmin = int(tools.max(0, x - ZOOM_AREA_WIDTH / 2))
-	xmax = int(tools.min(imgWidth, x + ZOOM_AREA_WIDTH / 2))
-	ymin = int(tools.max(0, y - ZOOM_AREA_HEIGHT / 2))
-	ymax = int(tools.min(imgHeight, y + ZOOM_AREA_HEIGHT / 2))
+	if trackSet is None:
+		trackSet = trackset.TrackSet([TRACK_FILE])
 
-	imgCrop = copy.copy(img[ymin:ymax, xmin:xmax])
+	trackManager = trackSet[0]
 
-	imgCrop = cv.resize(imgCrop, (int(zoomPercent * ZOOM_AREA_WIDTH), int(zoomPercent * ZOOM_AREA_HEIGHT)), interpolation = cv.INTER_CUBIC)
+	if profiler is None:
+		profiler = profiling.Profiler()
 
-	return imgCrop
+	# a simulated clock, so the simulation can run faster than real time
 
+	sim = simulation.Simulation(dt = dt, profiler = profiler, trackSet = trackSet, substeps = substeps, collision = collision)
 
-def getScreenSize():
-	'''
-	get screen size from monitor placed at x=0
-	'''
+	if populationRenderer is None:
+		populationRenderer = renderer.PopulationRenderer()
 
-	for m in screeninfo.get_monitors():
-		if (m.x == 0):
-			return m.width, m.height
+	display = displaying.Display(trackManager, screenSize, populationRenderer, fps, ticksPerFrame, profiler, hud, exporter)
 
-	print("cannot capture screen size")
-	sys.exit(-1)
+	leaderboard = ranking.Leaderboard(max(populationRenderer.detail, display.hud.topK))
 
-def resizeToFit(img, newsize):
-	'''
-	adjust height to fit into screen
-	'''
+	if resumeState is not None:
+		optimizer, streams = checkpoint.restore(resumeState, noveltySearch)
+		print("resuming %s after generation %d" %(optimizer.name, optimizer.generation - 1))
+	else:
+		if streams is None:
+			streams = randomstreams.RandomStreams()
 
-	SCREEN_VERTICAL_ADJ = 0.9	# window also has caption and menu
+		optimizer = optimizers.createOptimizer(optimizerName, genetics.genotypeDimension(), genotypesPerGeneration, streams.evolution())
 
-	imgResized = img
+	print("seed %d" %(streams.seed))
 
-	aspect_ratio = imgResized.shape[1] / imgResized.shape[0]
+	# a resumed population already went past the seeded generation
 
-	newHeight = int(newsize[1] * SCREEN_VERTICAL_ADJ)
-	newWidth = int(newsize[1] * SCREEN_VERTICAL_ADJ * aspect_ratio)
+	if (hallOfFame is not None) and (resumeState is None):
+		optimizer.seed(hallOfFame)
 
-	imgResized = cv.resize(imgResized, (newWidth, newHeight), interpolation = cv.INTER_CUBIC)
+	# genomes of the last generation culled by racing, their fitness is a lower bound
+	lowerBounds = None
 
-	return imgResized
+	# the windows stay on this thread, the generations run on a worker thread
 
-def createWindows():
-	cv.namedWindow('carSim')
-	cv.namedWindow('nn')
-	cv.namedWindow('zoom')
+	def simulate():
 
-	cv.moveWindow('carSim', 0, 0)
-	cv.moveWindow('nn', 700, 0)
-	cv.moveWindow('zoom', 700, 600)
+		nonlocal lowerBounds
 
+		done = False
+		best = None
+		secondBest = None
+		cars = None
+		paused = False
 
-def main(numgenerations = 100, genotypesPerGeneration = 10):
+		generation = numgenerations - optimizer.generation
 
-	screenSize = getScreenSize()
+		while generation > 0 and not done:
+
+			# new generation is born
 
-	createWindows()
+			generationStart = time.perf_counter()
+			breedingStart = generationStart
 
-	trackManager = tracks.TrackManager()
-	trackManager.load("tracks/track1_wp.png")
-	cv.imshow('carSim', trackManager.showTrack())
-	cv.waitKey(0)
+			with profiler.span('breeding'):
+				genomes = optimizer.ask()
 
+				if curriculum is None:
+					cars = sim.createCars(genomes, streams.cars(optimizer.generation, len(genomes)))
+				else:
+					cars = curriculum.createCars(sim, genomes, streams.cars(optimizer.generation, len(genomes)))
 
-	done = False
-	best = None
-	secondBest = None
-	cars = None
-	paused = False
+			# cars on the first track, one per genome (and start point of a curriculum)
 
-	trackImg = copy.copy(trackManager.getImage())
+			starts = 1 if curriculum is None else curriculum.starts
+			shown = cars[:len(genomes) * starts]
+			leaderboard.reset(shown)
 
-	generation = numgenerations
+			breedingTime = time.perf_counter() - breedingStart
 
-	while generation > 0 and not done:
 
-		# new generation is born
+			# let them live!
 
-		cars = genetics.createCars(genotypesPerGeneration, cars, best, secondBest)
+			exit = False
+			tick = 0
+			alive = []
 
-		# let the new born learn some basics from the track
+			# only the ticks themselves, not the display pacing nor the paused ticks
+			simulationTime = 0.0
 
-		for car in cars:
-			car.setPos(trackManager.getStart())
-			car.setSensorBounds(trackManager.getBounds())
+			if racer is not None:
+				racer.reset()
 
+			while not exit and not done:
+				key = display.takeKey()
+				exit = (key == '1')
+				done = (key == 'Q')
 
-		# let them live!
+				if (key == 'E'):
+					cars[0].turn_ratio = -math.pi / 180
+				elif (key == 'R'):
+					cars[0].turn_ratio = +math.pi / 180
+				else:
+					cars[0].turn_ratio = 0
 
-		exit = False
+				if (key == 'W'):
+					cars[0].throttle = 1.0
+				else:
+					cars[0].throttle = 0.0
 
-		while not exit and not done:
-			q = cv.waitKey(1) & 0xff
-			key = chr(q).upper()
-			exit = (key == '1')
-			done = (key == 'Q')
+				if (key == 'P'):
+					paused = not paused
+					if paused:
+						for c in cars:
+							c.pause()
+					else:
+						for c in cars:
+							c.resume()
 
-			if (key == 'E'):
-				cars[0].turn_ratio = -math.pi / 180
-			elif (key == 'R'):
-				cars[0].turn_ratio = +math.pi / 180
-			else:
-				cars[0].turn_ratio = 0
 
-			if (key == 'W'):
-				cars[0].throttle = 1.0
+				tickStart = time.perf_counter()
+				numAlive = sim.tick(cars)
+				tickTime = time.perf_counter() - tickStart
+
+				if not paused:
+					tick += 1
+					alive.append(numAlive)
+					simulationTime += tickTime
+
+					# stop the worst ones early
+
+					if racer is not None:
+						with profiler.span('racing'):
+							racer.update(cars, tick)
+
+					# stop the cars done with their segment, and all of them at the horizon
+
+					if curriculum is not None:
+						curriculum.update(cars, tick)
+
+						if (curriculum.horizon is not None) and (tick >= curriculum.horizon):
+							exit = True
+
+				with profiler.span('leaderboard'):
+					best, secondBest = leaderboard.update(sim.active)
+
+				if (trajectoryRecorder is not None) and not paused:
+					with profiler.span('record'):
+						trajectoryRecorder.record(shown, optimizer.generation, best, secondBest)
+
+				# the display loop draws it when it can
+
+				with profiler.span('publish'):
+					display.publish(shown, best, secondBest, optimizer.generation, tick, leaderboard.getTop())
+
+				# all cars died?
+
+				if sim.allDone():
+					exit = True
+
+			if curriculum is None:
+				fitness = sim.fitness(cars)
 			else:
-				cars[0].throttle = 0.0
+				fitness = curriculum.fitness(sim, cars)
+
+			objectives = None
+
+			if racer is not None:
+				lowerBounds = racer.lowerBounds(cars, len(genomes))
+
+			# behaviour is measured on the first track, completion aggregated over all
+
+			if multiObjective:
+				objectives = pareto.carObjectives(shown)
+				objectives[:, 0] = -fitness
+
+			if noveltySearch is not None:
+
+				# novelty is one more objective, maximized
 
-			if (key == 'P'):
-				paused = not paused
-				if paused:
-					for car in cars:
-						car.pause()
+				descriptors = novelty.behaviourDescriptors(shown, trackManager.getBounds(), trackManager.numWaypoints())
+				scores = noveltySearch.evaluate(descriptors)
+
+				if objectives is None:
+					objectives = np.column_stack((-fitness, -scores))
 				else:
-					for car in cars:
-						car.resume()
+					objectives = np.column_stack((objectives, -scores))
 
+				print("novelty mean %.3f max %.3f archive %d" %(np.mean(scores), np.max(scores), noveltySearch.archive.size()))
 
-			trackRes = copy.copy(trackImg)
+			tellStart = time.perf_counter()
 
-			for car in cars:
-				car.autopilot()
-				car.apply()
-				car.update()
-				car.checkForStuck()
-				car.draw_sensor_lines(trackImg, trackRes)
-				car.draw(trackRes)
+			with profiler.span('breeding'):
+				optimizer.tell(genomes, fitness, objectives)
 
-				trackManager.updateDistanceToNextWaypoint(car)
+			breedingTime += time.perf_counter() - tellStart
 
-			best, secondBest = trackManager.bestCar(cars)
+			# everything from ask to tell, display pacing and pauses included
+			wallTime = time.perf_counter() - generationStart
 
-			if best is not None:
-				zoomImg = zoom(trackRes, best.getPos()[0], best.getPos()[1])
-				cv.imshow('zoom', zoomImg)
+			if metricsWriter is not None:
+				metricsWriter.write(metrics.generationRecord(optimizer.generation - 1, fitness, alive, wallTime, simulationTime, breedingTime, optimizer.getBest()[1], lowerBounds))
 
+			print("finished generation %d best %.1f%%" %(numgenerations - generation, 100.0 * optimizer.getBest()[1]))
 
-			trackRes = resizeToFit(trackRes, screenSize)
+			profiler.printGeneration(profiler.endGeneration(optimizer.generation - 1))
 
+			if multiObjective:
+				printParetoFront(optimizer.getParetoFront()[1])
 
-			printStats(trackRes, 10, 20, trackManager, cars, best, secondBest)
-			cv.imshow('carSim', trackRes)
+			if racer is not None:
+				print("culled %d cars, the fitness of %d genomes is a lower bound" %(racer.numCulled, np.sum(lowerBounds)))
 
-			# all cars died?
+			if checkpointer is not None:
+				checkpointer.update(optimizer, streams, noveltySearch, lowerBounds)
 
-			if trackManager.allDone(cars):
-				exit = True
+			if lineageArchive is not None:
+				lineageArchive.append(genomes, fitness)
 
+			# show some info
 
-		print("finished generation %d" %(numgenerations - generation))
+			imgNeuron = showNeuronWeights(best, secondBest)
+			display.show('nn', imgNeuron)
 
-		# show some info
+			generation -= 1
 
-		imgNeuron = showNeuronWeights(best, secondBest)
-		cv.imshow('nn', imgNeuron)
+			# let see the data for a while before repeating
 
-		generation -= 1
+			if not done:
+				display.wait(2)
 
-		# let see the data for a while before repeating
+	display.run(simulate)
 
-		if not done:
-			sleep(2)
+	# make sure the last generation is saved before leaving
 
+	if checkpointer is not None:
+		if optimizer.generation % checkpointer.every != 0:
+			checkpointer.save(optimizer, streams, noveltySearch, lowerBounds)
 
-def printHelp():
-	print("exec: python main.py [evolutions] [children_per_evolution]")
+		checkpointer.close()
 
+	if trajectoryRecorder is not None:
+		trajectoryRecorder.close()
 
-if __name__ == '__main__':
+	profiler.close()
 
+	if metricsWriter is not None:
+		metricsWriter.close()
 
-	generations = 100
-	genotypesPerGeneration = 10
 
-	if len(sys.argv) > 3:
-		print("too many params")
-		printHelp()
-		sys.exit(-1)
+def parseArgs():
 
-	try:
+	parser = argparse.ArgumentParser(description = "genetic cars simulation")
+	parser.add_argument("evolutions", type = int, nargs = "?", default = 100, help = "how many evolutions there will be")
+	parser.add_argument("children_per_evolution", type = int, nargs = "?", default = 10, help = "how many genotypes will be created in each evolution")
+	parser.add_argument("--optimizer", default = "ga", choices = sorted(optimizers.OPTIMIZERS), help = "how the next generation is created")
+
+	parser.add_argument("--tracks", default = TRACK_FILE, help = "comma separated track files every genome is evaluated on, the first one is shown")
+	parser.add_argument("--aggregate", default = "mean", choices = trackset.AGGREGATES, help = "how the completions of a genome over the tracks make its fitness")
+	parser.add_argument("--track-weights", help = "comma separated weight of every track, for --aggregate weighted")
+	parser.add_argument("--seed", type = int, help = "seed of the run, same seed same results (random if not given, it is printed)")
+	parser.add_argument("--nsga2", action = "store_true", help = "rank cars by completion, time and distance (NSGA-II) instead of completion only")
+	parser.add_argument("--novelty", action = "store_true", help = "reward behaviours not seen before (novelty search) as an extra objective")
+	parser.add_argument("--novelty-k", type = int, default = 10, help = "neighbours used to measure novelty")
+	parser.add_argument("--racing", action = "store_true", help = "stop the worst cars early by successive halving")
+	parser.add_argument("--rung-horizon", type = int, default = 200, help = "ticks raced before the first cull")
+	parser.add_argument("--rung-growth", type = float, default = 2.0, help = "horizon multiplier between culls")
+	parser.add_argument("--rungs", type = int, default = 4, help = "number of culls per generation")
+	parser.add_argument("--cull-fraction", type = float, default = 0.5, help = "fraction of racing cars stopped at each cull")
+	parser.add_argument("--curriculum", type = int, metavar = "S", help = "evaluate every genome from S start points along the track at once, short horizons")
+	parser.add_argument("--horizon", type = int, default = 400, help = "ticks raced from every start point with --curriculum")
+	parser.add_argument("--checkpoint", default = "checkpoint.npz", help = "file where the run is saved")
+	parser.add_argument("--checkpoint-every", type = int, default = 0, help = "generations between checkpoints, 0 (the default) to disable")
+	parser.add_argument("--resume", metavar = "FILE", help = "continue the run saved in a checkpoint")
+	parser.add_argument("--lineage", metavar = "FILE", help = "append every generation to this lineage archive")
+	parser.add_argument("--seed-from", metavar = "FILE", help = "start the population from the hall of fame of a lineage archive")
+	parser.add_argument("--hall-of-fame", type = int, default = 10, help = "genomes taken from the lineage archive by --seed-from")
+	parser.add_argument("--record", metavar = "DIR", help = "record the trajectories of the selected cars, see replay.py")
+	parser.add_argument("--record-cars", default = "best", help = "cars to record: best, all or a comma separated list of car indices")
+	parser.add_argument("--detail", type = int, default = 10, help = "cars drawn with sensors and outline, the best ones")
+	parser.add_argument("--others", default = "outline", choices = renderer.OTHERS, help = "how the rest of the cars are drawn")
+	parser.add_argument("--fps", type = int, default = 30, help = "frames per second drawn by the display loop")
+	parser.add_argument("--ticks-per-frame", type = int, default = 1, help = "ticks simulated per displayed frame, 0 as fast as possible ('+'/'-' change it live)")
+	parser.add_argument("--dt", type = float, default = 1 / 30.0, help = "simulated seconds per tick")
+	parser.add_argument("--substeps", type = int, default = 1, help = "physics steps per tick, sensors and controller run once per tick")
+	parser.add_argument("--collision", default = "sensors", choices = simulation.COLLISIONS, help = "cars die when a front sensor reads too short, or when their outline touches a wall (footprint)")
+	parser.add_argument("--hud-top", type = int, default = 3, help = "cars shown in the stats panel, the best ones")
+	parser.add_argument("--hud-rate", type = float, default = 5.0, help = "times per second the stats panel is rendered")
+	parser.add_argument("--export", metavar = "FILE", help = "record the displayed frames to a video (.avi, .mp4) or images (frames/%%06d.png) on a background thread")
+	parser.add_argument("--export-every", type = int, default = 1, help = "export one displayed frame out of N")
+	parser.add_argument("--export-view", default = "track", choices = videoexport.VIEWS, help = "export the whole track or the zoom on the best car")
+	parser.add_argument("--export-policy", default = "drop", choices = videoexport.POLICIES, help = "when the encoder falls behind, drop frames or make the display wait")
+	parser.add_argument("--metrics", metavar = "FILE", help = "append training and throughput metrics of every generation to a .jsonl or .csv file")
+	parser.add_argument("--profile-csv", metavar = "FILE", help = "time spent in every phase of the loop, one row per phase and generation")
+	parser.add_argument("--profile-trace", metavar = "FILE", help = "every phase of the loop as a chrome trace (chrome://tracing, perfetto)")
 
-		if len(sys.argv) == 3:
-			generations = int(sys.argv[1])
-			genotypesPerGeneration = int(sys.argv[2])
+	return parser.parse_args()
 
-		if len(sys.argv) == 2:
-			generations = int(sys.argv[1])
+def runConfig(args):
 
-	except ValueError:
-		print("params must be numeric")
-		printHelp()
+	'''
+	options a run must keep to be resumed, saved in its checkpoints
+	'''
+
+	return {
+		'tracks': args.tracks.split(','),
+		'aggregate': args.aggregate,
+		'trackWeights': args.track_weights,
+		'dt': args.dt,
+		'substeps': args.substeps,
+		'collision': args.collision,
+		'nsga2': args.nsga2,
+		'novelty': args.novelty_k if args.novelty else None,
+		'racing': [args.rung_horizon, args.rung_growth, args.rungs, args.cull_fraction] if args.racing else None,
+		'curriculum': [args.curriculum, args.horizon] if args.curriculum is not None else None,
+	}
+
+
+if __name__ == '__main__':
+
+	args = parseArgs()
+
+	if args.hud_rate <= 0:
+		print("--hud-rate must be positive, got %g" %(args.hud_rate))
 		sys.exit(-1)
 
-	main(generations, genotypesPerGeneration)
-	sys.exit(0)
\ No newline at end of file
+	racer = None
+
+	if args.racing:
+		racer = racing.SuccessiveHalving(args.rung_horizon, args.rung_growth, args.cull_fraction, args.rungs)
+
+	noveltySearch = None
+
+	if args.novelty:
+		noveltySearch = novelty.NoveltySearch(args.novelty_k)
+
+	curriculum = None
+
+	if args.curriculum is not None:
+
+		# the other modes rate one car per genome raced from the start of the track
+
+		if args.racing or args.nsga2 or args.novelty:
+			print("--curriculum cannot be combined with --racing, --nsga2 or --novelty")
+			sys.exit(-1)
+
+		curriculum = curricula.Curriculum(args.curriculum, args.horizon)
+
+	config = runConfig(args)
+	checkpointer = None
+
+	if args.checkpoint_every > 0:
+		checkpointer = checkpoint.CheckpointWriter(args.checkpoint, args.checkpoint_every, config)
+
+	resumeState = None
+
+	if args.resume is not None:
+		resumeState = checkpoint.load(args.resume)
+		checkpoint.checkConfig(resumeState, config)
+
+	lineageArchive = None
+
+	if args.lineage is not None:
+		lineageArchive = lineage.LineageArchive(args.lineage)
+
+	hallOfFame = None
+
+	if args.seed_from is not None:
+		hallOfFame = lineage.LineageArchive(args.seed_from).hallOfFame(args.hall_of_fame)
+
+	trajectoryRecorder = None
+
+	if args.record is not None:
+		selection = args.record_cars
+
+		if selection not in ('best', 'all'):
+			selection = [int(i) for i in selection.split(',')]
+
+		trajectoryRecorder = recorder.TrajectoryRecorder(args.record, args.tracks.split(',')[0], car.Car.SENSOR_NUM, selection)
+
+	profiler = profiling.Profiler(args.profile_csv, args.profile_trace)
+
+	metricsWriter = None
+
+	if args.metrics is not None:
+		metricsWriter = metrics.MetricsWriter(args.metrics)
+
+	populationRenderer = renderer.PopulationRenderer(args.detail, args.others)
+
+	trackWeights = None
+
+	if args.track_weights is not None:
+		trackWeights = [float(w) for w in args.track_weights.split(',')]
+
+	trackSet = trackset.TrackSet(args.tracks.split(','), args.aggregate, trackWeights)
+
+	exporter = None
+
+	if args.export is not None:
+		exporter = videoexport.VideoExporter(args.export, args.fps, args.export_every, args.export_view, args.export_policy)
+
+	main(args.evolutions, args.children_per_evolution, args.optimizer, racer, args.nsga2, noveltySearch, checkpointer, resumeState, lineageArchive, hallOfFame, trajectoryRecorder, randomstreams.RandomStreams(args.seed), profiler, metricsWriter, populationRenderer, args.fps, args.ticks_per_frame, args.dt, overlay.Hud(args.hud_top, args.hud_rate), exporter, trackSet, args.substeps, args.collision, curriculum)
+	sys.exit(0)
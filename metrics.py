@@ -0,0 +1,121 @@
+import numpy as np
+import json
+import os
+import sys
+
+'''
+training metrics, one record per generation
+
+records go to a jsonl file (one json object per line) or a csv file, chosen by the
+extension; the file is opened with a large buffer and only flushed every few
+generations, so long unattended runs can be followed (tail -f) at no cost for the loop
+'''
+
+# points of the alive-count curve kept per generation
+ALIVE_SAMPLES = 32
+
+FIELDS = ['generation', 'best', 'mean', 'median', 'bestEver', 'ticks', 'carTicks', 'wallTime', 'simulationTime', 'breedingTime', 'carTicksPerSecond', 'alive', 'culled']
+
+
+def aliveCurve(alive, samples = ALIVE_SAMPLES):
+
+	'''
+	alive count of every tick resampled to a fixed number of points
+	'''
+
+	if len(alive) <= samples:
+		return [int(a) for a in alive]
+
+	index = np.linspace(0, len(alive) - 1, samples).round().astype(int)
+
+	return [int(alive[i]) for i in index]
+
+def generationRecord(generation, completions, alive, wallTime, simulationTime, breedingTime, bestEver = None, lowerBounds = None):
+
+	'''
+	metrics of a generation: completions of its cars, alive count of every tick,
+	seconds the generation took (wall clock, from ask to tell), spent simulating (ticks)
+	and breeding (ask, tell and car creation), and the genomes culled by racing
+	(lowerBounds mask), whose completion is a lower bound
+	'''
+
+	completions = np.asarray(completions, dtype = float)
+	carTicks = int(np.sum(alive))
+
+	return {
+		'generation': int(generation),
+		'best': float(np.max(completions)),
+		'mean': float(np.mean(completions)),
+		'median': float(np.median(completions)),
+		'bestEver': float(bestEver) if bestEver is not None else float(np.max(completions)),
+		'ticks': len(alive),
+		'carTicks': carTicks,
+		'wallTime': wallTime,
+		'simulationTime': simulationTime,
+		'breedingTime': breedingTime,
+		'carTicksPerSecond': carTicks / simulationTime if simulationTime > 0 else 0.0,
+		'alive': aliveCurve(alive),
+		'culled': [] if lowerBounds is None else [int(i) for i in np.flatnonzero(lowerBounds)],
+	}
+
+
+class MetricsWriter:
+
+	'''
+	appends generation records to a .jsonl or .csv file
+	'''
+
+	BUFFER_SIZE = 1 << 16
+
+	def __init__(self, filename, flushEvery = 10):
+
+		extension = os.path.splitext(filename)[1].lower()
+
+		if extension not in ('.jsonl', '.csv'):
+			print("metrics file %s must be .jsonl or .csv" %(filename))
+			sys.exit(-1)
+
+		self.csv = (extension == '.csv')
+		self.flushEvery = flushEvery
+		self.written = 0
+
+		header = self.csv and ((not os.path.exists(filename)) or (os.path.getsize(filename) == 0))
+
+		self.f = open(filename, 'a', buffering = self.BUFFER_SIZE)
+
+		if header:
+			self.f.write(",".join(FIELDS) + "\n")
+
+	def write(self, record):
+		'''
+		queue a record in the file buffer, the file is flushed every flushEvery records
+		'''
+
+		if self.csv:
+			values = []
+
+			for field in FIELDS:
+				value = record[field]
+
+				# the alive curve (and culled genomes) is one column, its points separated by spaces
+				if isinstance(value, list):
+					value = " ".join(str(v) for v in value)
+				elif isinstance(value, float):
+					value = "%.6g" %(value)
+
+				values.append(str(value))
+
+			self.f.write(",".join(values) + "\n")
+		else:
+			self.f.write(json.dumps(record) + "\n")
+
+		self.written += 1
+
+		if self.written % self.flushEvery == 0:
+			self.f.flush()
+
+	def close(self):
+
+		if self.f is not None:
+			self.f.close()
+			self.f = None
@@ -3,6 +3,7 @@ import copy
 import sys
 import cv2 as cv
 import tools
+import randomstreams
 
 class NeuralLayer:
 	'''
@@ -87,16 +88,17 @@ class NeuralLayer:
 
 		return sum
 
-	def randomWeights(self, min, max):
+	def randomWeights(self, min, max, rng = None):
 		'''
 		set random weights to the layer
 		'''
 		
 		rango = abs(min - max)
+		rng = randomstreams.generator(rng)
 
 		for j in range(self.outputCount):
 			for i in range(self.nodeCount + 1):
-				self.weights[j, i] = min + (np.random.rand() * rango)
+				self.weights[j, i] = min + (rng.random() * rango)
 
 
 
@@ -152,12 +154,12 @@ class NeuralNetwork:
 
 		return outputs
 
-	def randomWeights(self, min = -1.0, max = 1.0):
+	def randomWeights(self, min = -1.0, max = 1.0, rng = None):
 		'''
 		apply random weights to all layers
 		'''
 		for layer in self.layers:
-			layer.randomWeights(min, max)
+			layer.randomWeights(min, max, rng)
 
 	def show(self):
 		k = 1
@@ -184,6 +186,18 @@ class NeuralNetwork:
 
 		return weights
 
+	def getDimension(self):
+		'''
+		total number of weights and biases of the network
+		'''
+
+		dimension = 0
+
+		for layer in self.layers:
+			dimension += layer.getDimension()
+
+		return dimension
+
 	def setWeights(self, weights):
 		'''
 		apply weights in a layer to layer basis
@@ -0,0 +1,253 @@
+import numpy as np
+import heapq
+import sys
+
+'''
+novelty search
+
+every car is described by its behaviour (where it ended, how many waypoints it got
+and a few samples of its trajectory), descriptors go into a growing archive
+novelty is the mean distance to the k nearest neighbours among the archive and
+the current population
+
+the archive is a forest of static kd-trees of decreasing sizes: adding points
+only rebuilds the small trees that get merged, and a query visits each tree in
+O(log size), so a generation costs O(N log A) instead of a scan of the archive
+'''
+
+
+class KDTree:
+
+	'''
+	static kd-tree over a (N, D) point matrix, leaves hold up to LEAF_SIZE points
+	'''
+
+	LEAF_SIZE = 16
+
+	def __init__(self, points):
+
+		self.points = np.asarray(points, dtype = np.float64)
+		self.index = np.arange(self.points.shape[0])
+
+		# node arrays: [start, end) range of index, split dim and value, children (-1 for leaves)
+		self.start = []
+		self.end = []
+		self.splitDim = []
+		self.splitValue = []
+		self.left = []
+		self.right = []
+
+		if self.points.shape[0] > 0:
+			self.build(0, self.points.shape[0])
+
+	def size(self):
+		return self.points.shape[0]
+
+	def newNode(self, start, end):
+		self.start.append(start)
+		self.end.append(end)
+		self.splitDim.append(-1)
+		self.splitValue.append(0.0)
+		self.left.append(-1)
+		self.right.append(-1)
+
+		return len(self.start) - 1
+
+	def build(self, start, end):
+		'''
+		split the [start, end) range by the median of its widest dimension
+		'''
+
+		node = self.newNode(start, end)
+
+		if end - start <= self.LEAF_SIZE:
+			return node
+
+		idx = self.index[start:end]
+		p = self.points[idx]
+
+		dim = int(np.argmax(p.max(axis = 0) - p.min(axis = 0)))
+		mid = (end - start) // 2
+
+		order = np.argpartition(p[:, dim], mid)
+		self.index[start:end] = idx[order]
+
+		self.splitDim[node] = dim
+		self.splitValue[node] = self.points[self.index[start + mid], dim]
+		self.left[node] = self.build(start, start + mid)
+		self.right[node] = self.build(start + mid, end)
+
+		return node
+
+	def search(self, q, k, heap, node = 0):
+		'''
+		push the nearest neighbours of q into heap
+		heap holds (-squared distance, tree, point id) of the k best found so far, shared between trees
+		'''
+
+		if self.size() == 0:
+			return
+
+		if self.left[node] < 0:
+
+			idx = self.index[self.start[node]:self.end[node]]
+			d2 = np.sum((self.points[idx] - q) ** 2, axis = 1)
+
+			for i in range(len(idx)):
+				if len(heap) < k:
+					heapq.heappush(heap, (-d2[i], id(self), int(idx[i])))
+				elif d2[i] < -heap[0][0]:
+					heapq.heapreplace(heap, (-d2[i], id(self), int(idx[i])))
+
+			return
+
+		diff = q[self.splitDim[node]] - self.splitValue[node]
+
+		if diff < 0:
+			near, far = self.left[node], self.right[node]
+		else:
+			near, far = self.right[node], self.left[node]
+
+		self.search(q, k, heap, near)
+
+		if (len(heap) < k) or (diff * diff < -heap[0][0]):
+			self.search(q, k, heap, far)
+
+
+class NoveltyArchive:
+
+	'''
+	growing archive of behaviour descriptors, kept as a forest of kd-trees
+	'''
+
+	def __init__(self):
+		self.trees = []
+
+	def size(self):
+		return sum(tree.size() for tree in self.trees)
+
+	def add(self, descriptors):
+		'''
+		add a batch of descriptors, trees of similar size are merged (binary counter)
+		'''
+
+		descriptors = np.asarray(descriptors, dtype = np.float64)
+
+		if descriptors.shape[0] == 0:
+			return
+
+		pending = descriptors
+
+		while len(self.trees) > 0 and self.trees[-1].size() <= pending.shape[0]:
+			pending = np.vstack((self.trees.pop().points, pending))
+
+		self.trees.append(KDTree(pending))
+
+	def getPoints(self):
+		'''
+		every archived descriptor as one matrix
+		'''
+
+		if len(self.trees) == 0:
+			return np.zeros((0, 0))
+
+		return np.vstack([tree.points for tree in self.trees])
+
+	def knnDistances(self, queries, k, extraTree = None):
+		'''
+		(N, k) sorted distances to the k nearest archived descriptors of every query
+		extraTree is searched too (e.g. the current population)
+		missing neighbours are reported as nan
+		'''
+
+		queries = np.asarray(queries, dtype = np.float64)
+		trees = list(self.trees)
+
+		if extraTree is not None:
+			trees.append(extraTree)
+
+		distances = np.full((queries.shape[0], k), np.nan)
+
+		for i in range(queries.shape[0]):
+			heap = []
+
+			for tree in trees:
+				tree.search(queries[i], k, heap)
+
+			d = np.sort(np.sqrt([-h[0] for h in heap]))
+			distances[i, :len(d)] = d
+
+		return distances
+
+
+def behaviourDescriptors(cars, bounds, numWaypoints):
+
+	'''
+	(N, 3 + 2 * Car.TRAJECTORY_SAMPLES) matrix: final position, waypoint index and the sampled trajectory
+	positions are normalized by the track size and the waypoint index by the number of waypoints
+	'''
+
+	rows = []
+
+	for car in cars:
+		x, y = car.getPos()
+		samples = list(car.trajectory)
+
+		while len(samples) < car.TRAJECTORY_SAMPLES:
+			samples.append((x, y))
+
+		row = [x / bounds[0], y / bounds[1], car.waypointIndex / max(1, numWaypoints)]
+
+		for sx, sy in samples:
+			row.append(sx / bounds[0])
+			row.append(sy / bounds[1])
+
+		rows.append(row)
+
+	return np.array(rows, dtype = np.float64)
+
+
+class NoveltySearch:
+
+	'''
+	scores a population by novelty and feeds the most novel ones to the archive
+	'''
+
+	def __init__(self, k = 10, archiveAdd = 2):
+
+		if (k < 1):
+			print("novelty needs at least one neighbour")
+			sys.exit(-1)
+
+		self.k = k
+		self.archiveAdd = archiveAdd
+		self.archive = NoveltyArchive()
+
+	def novelty(self, descriptors):
+		'''
+		mean distance to the k nearest neighbours among archive and population, self excluded
+		'''
+
+		descriptors = np.asarray(descriptors, dtype = np.float64)
+		population = KDTree(descriptors)
+
+		# k + 1 as every descriptor finds itself in the population tree
+		distances = self.archive.knnDistances(descriptors, self.k + 1, population)
+
+		distances = distances[:, 1:]
+		found = np.sum(~np.isnan(distances), axis = 1)
+
+		return np.nansum(distances, axis = 1) / np.maximum(found, 1)
+
+	def evaluate(self, descriptors):
+		'''
+		novelty of every descriptor, the most novel ones are archived afterwards
+		'''
+
+		descriptors = np.asarray(descriptors, dtype = np.float64)
+		scores = self.novelty(descriptors)
+
+		order = np.argsort(-scores, kind = 'stable')
+		self.archive.add(descriptors[order[:self.archiveAdd]])
+
+		return scores
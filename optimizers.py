@@ -0,0 +1,411 @@
+import numpy as np
+import math
+import sys
+import genetics
+import pareto
+import species
+import randomstreams
+
+'''
+pluggable optimizers
+
+every generation the optimizer is asked for a genome matrix (one row per individual)
+and, once the population has been evaluated, told the fitness vector of that matrix
+fitness is maximized (track completion)
+'''
+
+
+class Optimizer:
+
+	'''
+	base optimizer, holds the best genome ever seen
+	'''
+
+	# attributes saved by getState, arrays or scalars
+	STATE = ['generation', 'bestGenotype', 'bestFitness', 'paretoGenomes', 'paretoObjectives', 'lastGenomes', 'fitnessHistory']
+
+	def __init__(self, dimension, popsize, rng = None):
+
+		if (popsize < 2):
+			print("new generation must contain at least 2")
+			sys.exit(-1)
+
+		self.dimension = dimension
+		self.popsize = popsize
+		self.generation = 0
+		self.rng = randomstreams.generator(rng)
+
+		self.bestGenotype = None
+		self.bestFitness = -np.inf
+
+		self.paretoGenomes = None
+		self.paretoObjectives = None
+
+		self.lastGenomes = None
+		self.fitnessHistory = np.zeros((0, popsize))
+
+		self.seedGenomes = None
+
+	def ask(self):
+		'''
+		returns a (popsize, dimension) genome matrix to be evaluated
+		'''
+
+		if self.seedGenomes is not None:
+			genomes = self.seedGenomes
+			self.seedGenomes = None
+			return genomes
+
+		return self.sample()
+
+	def sample(self):
+		'''
+		optimizer specific genome matrix, called from ask
+		'''
+
+		print("optimizer must implement sample")
+		sys.exit(-1)
+
+	def seed(self, hallOfFame):
+		'''
+		the next generation starts from these genomes (see genetics.seedGenotypes)
+		instead of the optimizer own samples
+		'''
+
+		self.seedGenomes = np.array(genetics.seedGenotypes(hallOfFame, self.popsize, self.rng), dtype = np.float64)
+
+	def tell(self, genomes, fitness, objectives = None):
+		'''
+		feed back the fitness of every row of genomes
+
+		if an objective matrix is given (one row per genome, every column minimized)
+		the population is ranked by NSGA-II instead of by fitness
+		'''
+
+		genomes = np.asarray(genomes, dtype = np.float64)
+		fitness = np.asarray(fitness, dtype = np.float64)
+
+		if (genomes.shape[0] != fitness.shape[0]):
+			print("one fitness value expected per genome")
+			sys.exit(-1)
+
+		i = int(np.argmax(fitness))
+
+		if fitness[i] > self.bestFitness:
+			self.bestFitness = fitness[i]
+			self.bestGenotype = genomes[i].copy()
+
+		if objectives is None:
+			order = np.argsort(-fitness, kind = 'stable')
+		else:
+			objectives = np.asarray(objectives, dtype = np.float64)
+			order = pareto.rank(objectives)
+
+			front = pareto.paretoFront(objectives)
+			self.paretoGenomes = genomes[front].copy()
+			self.paretoObjectives = objectives[front].copy()
+
+		self.lastGenomes = genomes.copy()
+
+		if fitness.shape[0] == self.fitnessHistory.shape[1]:
+			self.fitnessHistory = np.vstack((self.fitnessHistory, fitness))
+
+		self.update(genomes, fitness, order)
+		self.generation += 1
+
+	def update(self, genomes, fitness, order):
+		'''
+		optimizer specific step, called from tell
+		order holds the genome indices sorted best first
+		'''
+
+		pass
+
+	def randomGenomes(self, min = -1.0, max = 1.0):
+		'''
+		uniform random genomes, same range as NeuralNetwork.randomWeights
+		'''
+
+		return min + self.rng.random((self.popsize, self.dimension)) * abs(max - min)
+
+	def getBest(self):
+		return self.bestGenotype, self.bestFitness
+
+	def getState(self):
+		'''
+		dict of arrays with everything needed to continue the run, see STATE
+		'''
+
+		state = {}
+
+		for name in self.STATE:
+			value = getattr(self, name)
+
+			if value is not None:
+				state[name] = np.asarray(value)
+
+		return state
+
+	def setState(self, state):
+		'''
+		restore a dict given by getState
+		'''
+
+		for name in self.STATE:
+			if name in state:
+				value = np.asarray(state[name])
+
+				if value.ndim == 0:
+					value = value.item()
+
+				setattr(self, name, value)
+
+	def getParetoFront(self):
+		'''
+		non-dominated genomes and their objectives from the last generation told with objectives
+		'''
+
+		return self.paretoGenomes, self.paretoObjectives
+
+
+class GeneticOptimizer(Optimizer):
+
+	'''
+	two parents create the entire population (genetics.crossOverAndMutationGenotypes)
+	'''
+
+	STATE = Optimizer.STATE + ['parent1', 'parent2']
+
+	def __init__(self, dimension, popsize, rng = None):
+		Optimizer.__init__(self, dimension, popsize, rng)
+
+		self.parent1 = None
+		self.parent2 = None
+
+	def sample(self):
+
+		if (self.parent1 is None) or (self.parent2 is None):
+			return self.randomGenomes()
+
+		children = genetics.crossOverAndMutationGenotypes(self.parent1, self.parent2, self.popsize, self.rng)
+
+		return np.array(children, dtype = np.float64)
+
+	def update(self, genomes, fitness, order):
+
+		# best two of this generation are the parents of the next one
+
+		self.parent1 = genomes[order[0]].copy()
+		self.parent2 = genomes[order[1]].copy()
+
+
+class SpeciesOptimizer(Optimizer):
+
+	'''
+	genetic algorithm with speciation (species.Speciation)
+
+	fitness is shared inside every species, children are spread between species
+	by their shared fitness and bred from the best two members of their species
+	'''
+
+	def __init__(self, dimension, popsize, rng = None, threshold = 0.5, targetSpecies = 5):
+		Optimizer.__init__(self, dimension, popsize, rng)
+
+		self.speciation = species.Speciation(threshold, targetSpecies)
+		self.parents = None
+
+	def getState(self):
+
+		state = Optimizer.getState(self)
+		state.update(self.speciation.getState())
+
+		if self.parents is not None:
+			state['parents1'] = np.array([p[0] for p in self.parents])
+			state['parents2'] = np.array([p[1] for p in self.parents])
+			state['parentsChildren'] = np.array([p[2] for p in self.parents], dtype = np.int64)
+
+		return state
+
+	def setState(self, state):
+
+		Optimizer.setState(self, state)
+		self.speciation.setState(state)
+
+		if 'parents1' in state:
+			self.parents = list(zip(state['parents1'], state['parents2'], [int(c) for c in state['parentsChildren']]))
+
+	def sample(self):
+
+		if self.parents is None:
+			return self.randomGenomes()
+
+		children = []
+
+		for parent1, parent2, numchildren in self.parents:
+			children += genetics.crossOverAndMutationGenotypes(parent1, parent2, numchildren, self.rng)
+
+		return np.array(children, dtype = np.float64)
+
+	def update(self, genomes, fitness, order):
+
+		# rank based score, so NSGA-II orders can be shared too
+
+		score = np.empty(len(order))
+		score[order] = np.arange(len(order), 0, -1)
+
+		labels = self.speciation.assign(genomes)
+		ids, counts = species.offspringCounts(score, labels, self.popsize)
+
+		self.parents = []
+
+		for k in range(len(ids)):
+
+			if counts[k] == 0:
+				continue
+
+			members = np.flatnonzero(labels == ids[k])
+			members = members[np.argsort(-score[members], kind = 'stable')]
+
+			parent1 = genomes[members[0]].copy()
+			parent2 = genomes[members[min(1, len(members) - 1)]].copy()
+
+			self.parents.append((parent1, parent2, int(counts[k])))
+
+
+class CMAESOptimizer(Optimizer):
+
+	'''
+	covariance matrix adaptation evolution strategy
+
+	the whole population is sampled as one matrix from N(mean, sigma^2 C)
+	and the distribution is updated with rank-mu and rank-one updates
+
+	separable = True keeps only the diagonal of C (sep-CMA-ES), linear cost
+	in the dimension and faster learning rates, good enough for small networks
+
+	the default step size is as wide as the mutations of the genetic algorithm
+	(genes move by up to 2), a smaller one stays around the zero network for
+	tens of generations
+	'''
+
+	STATE = Optimizer.STATE + ['mean', 'sigma', 'pc', 'ps', 'B', 'D', 'C']
+
+	def __init__(self, dimension, popsize, rng = None, sigma = 3.0, mean = None, separable = False):
+		Optimizer.__init__(self, dimension, popsize, rng)
+
+		n = dimension
+
+		self.separable = separable
+		self.sigma = sigma
+
+		if mean is None:
+			self.mean = np.zeros(n)
+		else:
+			self.mean = np.array(mean, dtype = np.float64)
+
+		# selection weights
+
+		self.mu = popsize // 2
+		w = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+		self.weights = w / np.sum(w)
+		self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+		# learning rates
+
+		self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+		self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+		self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+		self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+
+		if separable:
+			self.c1 = min(1.0, self.c1 * (n + 2) / 3)
+			self.cmu = min(1 - self.c1, self.cmu * (n + 2) / 3)
+
+		self.damps = 1 + 2 * max(0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+		self.chiN = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+
+		# evolution paths and covariance, C = B diag(D^2) B^T
+
+		self.pc = np.zeros(n)
+		self.ps = np.zeros(n)
+		self.B = np.eye(n)
+		self.D = np.ones(n)
+		self.C = np.eye(n)
+
+	def sample(self):
+
+		z = self.rng.standard_normal((self.popsize, self.dimension))
+
+		if self.separable:
+			y = z * self.D
+		else:
+			y = (z * self.D) @ self.B.T
+
+		return self.mean + self.sigma * y
+
+	def update(self, genomes, fitness, order):
+
+		n = self.dimension
+
+		# steps of the selected genomes, best first
+
+		y = (genomes[order[:self.mu]] - self.mean) / self.sigma
+		yw = self.weights @ y
+
+		self.mean = self.mean + self.sigma * yw
+
+		# step-size path, C^-1/2 yw
+
+		if self.separable:
+			invsqrt = yw / self.D
+		else:
+			invsqrt = self.B @ ((self.B.T @ yw) / self.D)
+
+		self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * invsqrt
+
+		psnorm = np.linalg.norm(self.ps)
+		hsig = psnorm / math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chiN < 1.4 + 2 / (n + 1)
+
+		self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * yw
+
+		# covariance, rank-one plus rank-mu
+
+		delta = (1 - hsig) * self.cc * (2 - self.cc)
+
+		if self.separable:
+			c = self.D ** 2
+			c = (1 - self.c1 - self.cmu) * c + self.c1 * (self.pc ** 2 + delta * c) + self.cmu * (self.weights @ (y ** 2))
+			self.D = np.sqrt(np.maximum(c, 1e-20))
+		else:
+			C = (1 - self.c1 - self.cmu) * self.C + self.c1 * (np.outer(self.pc, self.pc) + delta * self.C) + self.cmu * ((y.T * self.weights) @ y)
+			self.C = (C + C.T) / 2
+
+			d2, self.B = np.linalg.eigh(self.C)
+			self.D = np.sqrt(np.maximum(d2, 1e-20))
+
+		# step size
+
+		self.sigma *= math.exp((self.cs / self.damps) * (psnorm / self.chiN - 1))
+
+
+OPTIMIZERS = {
+	'ga': lambda dimension, popsize, rng: GeneticOptimizer(dimension, popsize, rng),
+	'species': lambda dimension, popsize, rng: SpeciesOptimizer(dimension, popsize, rng),
+	'cmaes': lambda dimension, popsize, rng: CMAESOptimizer(dimension, popsize, rng),
+	'sepcmaes': lambda dimension, popsize, rng: CMAESOptimizer(dimension, popsize, rng, separable = True),
+}
+
+def createOptimizer(name, dimension, popsize, rng = None):
+
+	'''
+	build an optimizer by name, see OPTIMIZERS
+	'''
+
+	if name not in OPTIMIZERS:
+		print("unknown optimizer %s, expecting one of %s" %(name, ", ".join(sorted(OPTIMIZERS))))
+		sys.exit(-1)
+
+	optimizer = OPTIMIZERS[name](dimension, popsize, rng)
+	optimizer.name = name
+
+	return optimizer
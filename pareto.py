@@ -0,0 +1,149 @@
+import numpy as np
+
+'''
+multi-objective selection (NSGA-II)
+
+objectives come as a (N, M) matrix, one row per individual, every column is minimized
+fronts and crowding distances are computed with whole-matrix numpy operations,
+no loops over pairs of individuals
+'''
+
+DOMINANCE_CHUNK_ELEMENTS = 1 << 22
+
+
+def carObjectives(cars):
+
+	'''
+	objective matrix of a population: completion (maximized), time per completion
+	and distance driven per completion
+
+	progressTime is the time of the last waypoint crossed, so time per completion is
+	measured up to it; cars that never crossed one get the worst time of the population
+	(instead of 0, which would make them the fastest), and cars that never moved
+	forward the worst distance (instead of 0, which would make them the thriftiest)
+	'''
+
+	completion = np.array([car.completion() for car in cars], dtype = np.float64)
+	trackCompletion = np.array([car.trackCompletion for car in cars], dtype = np.float64)
+	progressTime = np.array([car.progressTime for car in cars], dtype = np.float64)
+	odometer = np.array([car.odometer for car in cars], dtype = np.float64)
+
+	progressed = trackCompletion > 0
+	timePerCompletion = np.zeros(len(completion))
+	timePerCompletion[progressed] = progressTime[progressed] / trackCompletion[progressed]
+
+	if np.any(progressed):
+		timePerCompletion[~progressed] = np.max(timePerCompletion[progressed])
+
+	moved = completion > 0
+	distancePerCompletion = np.zeros(len(completion))
+	distancePerCompletion[moved] = odometer[moved] / completion[moved]
+
+	if np.any(moved):
+		distancePerCompletion[~moved] = np.max(distancePerCompletion[moved])
+
+	return np.column_stack((-completion, timePerCompletion, distancePerCompletion))
+
+def dominance(objectives):
+
+	'''
+	(N, N) boolean matrix, [i, j] is True when i dominates j
+	'''
+
+	f = np.asarray(objectives, dtype = np.float64)
+	n, m = f.shape
+
+	dominates = np.empty((n, n), dtype = bool)
+
+	# rows in chunks so the (chunk, N, M) comparisons stay small for big populations
+
+	chunk = max(1, DOMINANCE_CHUNK_ELEMENTS // max(1, n * m))
+
+	for i in range(0, n, chunk):
+		fi = f[i:i + chunk, None, :]
+		lessEqual = np.all(fi <= f[None, :, :], axis = 2)
+		less = np.any(fi < f[None, :, :], axis = 2)
+		dominates[i:i + chunk] = lessEqual & less
+
+	return dominates
+
+def nonDominatedSort(objectives):
+
+	'''
+	fast non-dominated sort, returns the front index of every individual (0 is the pareto front)
+	'''
+
+	dominates = dominance(objectives)
+	n = dominates.shape[0]
+
+	ranks = np.full(n, -1, dtype = np.int64)
+	dominatedBy = dominates.sum(axis = 0)
+
+	front = np.flatnonzero(dominatedBy == 0)
+	k = 0
+
+	while front.size > 0:
+		ranks[front] = k
+		dominatedBy = dominatedBy - dominates[front].sum(axis = 0)
+		dominatedBy[front] = -1
+		front = np.flatnonzero(dominatedBy == 0)
+		k += 1
+
+	return ranks
+
+def crowdingDistance(objectives, ranks):
+
+	'''
+	crowding distance of every individual inside its own front
+	boundary individuals get infinite distance
+	'''
+
+	f = np.asarray(objectives, dtype = np.float64)
+	n, m = f.shape
+
+	distance = np.zeros(n)
+
+	for k in range(ranks.max() + 1 if n > 0 else 0):
+
+		members = np.flatnonzero(ranks == k)
+		fk = f[members]
+
+		order = np.argsort(fk, axis = 0, kind = 'stable')
+		sortedf = np.take_along_axis(fk, order, axis = 0)
+
+		span = sortedf[-1] - sortedf[0]
+		span[span == 0] = 1
+
+		gaps = np.zeros_like(sortedf)
+		gaps[1:-1] = (sortedf[2:] - sortedf[:-2]) / span
+		gaps[0] = np.inf
+		gaps[-1] = np.inf
+
+		d = np.zeros_like(sortedf)
+		np.put_along_axis(d, order, gaps, axis = 0)
+
+		distance[members] = d.sum(axis = 1)
+
+	return distance
+
+def rank(objectives):
+
+	'''
+	indices of the population sorted best first: lower front first, then larger
+	crowding distance
+	'''
+
+	objectives = np.asarray(objectives, dtype = np.float64)
+
+	ranks = nonDominatedSort(objectives)
+	crowding = crowdingDistance(objectives, ranks)
+
+	return np.lexsort((-crowding, ranks))
+
+def paretoFront(objectives):
+
+	'''
+	indices of the non-dominated individuals
+	'''
+
+	return np.flatnonzero(nonDominatedSort(objectives) == 0)
@@ -0,0 +1,192 @@
+import contextlib
+import json
+import threading
+import time
+
+'''
+per-phase tick instrumentation
+
+phases of the loop are wrapped in spans:
+
+	with profiler.span('update'):
+		...
+
+a disabled profiler hands back the same do-nothing context for every span, so the
+instrumentation can stay in the hot loop; an enabled one sums the time and calls of
+every phase per generation (written as csv rows) and optionally keeps every span as
+an event of a chrome trace (open it in chrome://tracing or https://ui.perfetto.dev)
+
+spans can be opened from several threads (simulation thread and display loop), every
+thread has its own stack of open spans and its own row in the trace
+'''
+
+NULL_SPAN = contextlib.nullcontext()
+
+CSV_HEADER = "generation,phase,calls,total_ms,mean_us,share\n"
+
+
+class Profiler:
+
+	'''
+	span timer, disabled unless a csv or trace file is given (or enabled = True)
+	'''
+
+	# events kept for the trace, older runs are cut rather than eating all the memory
+	MAX_EVENTS = 2000000
+
+	def __init__(self, csvFile = None, traceFile = None, enabled = None):
+
+		if enabled is None:
+			enabled = (csvFile is not None) or (traceFile is not None)
+
+		self.enabled = enabled
+		self.csvFile = csvFile
+		self.traceFile = traceFile
+
+		self.csv = None
+
+		if enabled and (csvFile is not None):
+			self.csv = open(csvFile, 'w')
+			self.csv.write(CSV_HEADER)
+
+		self.events = []
+		self.dropped = 0
+
+		# open spans of every thread
+		self.local = threading.local()
+		self.lock = threading.Lock()
+		self.threads = 0
+
+		self.totals = {}
+		self.calls = {}
+
+		self.origin = time.perf_counter()
+		self.generationStart = self.origin
+
+	def span(self, name):
+		'''
+		context timing the block as phase name
+		'''
+
+		if not self.enabled:
+			return NULL_SPAN
+
+		self.stack().names.append(name)
+
+		return self
+
+	def stack(self):
+		'''
+		open spans of the calling thread
+		'''
+
+		local = self.local
+
+		if not hasattr(local, 'names'):
+			local.names = []
+			local.starts = []
+
+			with self.lock:
+				self.threads += 1
+				local.thread = self.threads
+
+		return local
+
+	def __enter__(self):
+		self.local.starts.append(time.perf_counter())
+
+	def __exit__(self, *exception):
+
+		end = time.perf_counter()
+		local = self.local
+		start = local.starts.pop()
+		name = local.names.pop()
+
+		with self.lock:
+			self.totals[name] = self.totals.get(name, 0.0) + (end - start)
+			self.calls[name] = self.calls.get(name, 0) + 1
+
+			if self.traceFile is not None:
+				if len(self.events) < self.MAX_EVENTS:
+					self.events.append((name, start, end - start, local.thread))
+				else:
+					self.dropped += 1
+
+		return False
+
+	def endGeneration(self, generation):
+		'''
+		close the aggregation of a generation, returns its rows (phase, calls, seconds)
+		sorted by time spent
+		'''
+
+		if not self.enabled:
+			return []
+
+		now = time.perf_counter()
+		elapsed = now - self.generationStart
+
+		with self.lock:
+			rows = sorted(((name, self.calls[name], self.totals[name]) for name in self.totals), key = lambda r: -r[2])
+
+			self.totals = {}
+			self.calls = {}
+
+		if self.csv is not None:
+			for name, calls, total in rows:
+				self.csv.write("%d,%s,%d,%.3f,%.3f,%.4f\n" %(generation, name, calls, total * 1e3, total * 1e6 / calls, total / elapsed if elapsed > 0 else 0.0))
+
+			self.csv.flush()
+
+		if self.traceFile is not None:
+			with self.lock:
+				self.events.append(('generation %d' %(generation), self.generationStart, elapsed, 0))
+
+		self.generationStart = now
+
+		return rows
+
+	def printGeneration(self, rows, top = 6):
+		'''
+		one line with the phases taking the most time
+		'''
+
+		if len(rows) == 0:
+			return
+
+		total = sum(r[2] for r in rows)
+		print("phases: " + ", ".join("%s %.0f%%" %(name, 100 * seconds / total) for name, calls, seconds in rows[:top]))
+
+	def writeTrace(self):
+		'''
+		write the spans as chrome trace events (complete events, microseconds)
+		'''
+
+		events = []
+
+		# thread 0 holds the generations, spans are on the row of their thread
+		for name, start, duration, thread in self.events:
+			events.append({
+				'name': name,
+				'cat': 'generation' if thread == 0 else 'tick',
+				'ph': 'X',
+				'ts': (start - self.origin) * 1e6,
+				'dur': duration * 1e6,
+				'pid': 0,
+				'tid': thread,
+			})
+
+		with open(self.traceFile, 'w') as f:
+			json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+		if self.dropped > 0:
+			print("trace full, %d spans not written" %(self.dropped))
+
+	def close(self):
+
+		if self.csv is not None:
+			self.csv.close()
+			self.csv = None
+
+		if self.enabled and (self.traceFile is not None):
+			self.writeTrace()
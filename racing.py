@@ -0,0 +1,119 @@
+import numpy as np
+import math
+import sys
+
+'''
+successive halving
+
+all cars race for a short horizon, then the worst fraction of the ones still racing
+is stopped and the survivors race again for a geometrically longer horizon; with a
+track set the cars of every track are ranked and culled among themselves
+culled cars keep their completion as a lower bound of their fitness, and are
+ranked on it like any other car: they were the slowest ones still racing, so the
+optimizers need nothing else to rank them behind the survivors
+'''
+
+
+class SuccessiveHalving:
+
+	'''
+	racing evaluator, call update once per tick with the tick count of the generation
+	'''
+
+	def __init__(self, firstHorizon = 200, growth = 2.0, cullFraction = 0.5, maxRungs = 4, minSurvivors = 2):
+
+		if (firstHorizon < 1):
+			print("first horizon must be at least one tick")
+			sys.exit(-1)
+
+		if (growth < 1):
+			print("horizon growth must be at least 1")
+			sys.exit(-1)
+
+		if (cullFraction < 0) or (cullFraction >= 1):
+			print("cull fraction must be in [0, 1)")
+			sys.exit(-1)
+
+		self.firstHorizon = firstHorizon
+		self.growth = growth
+		self.cullFraction = cullFraction
+		self.maxRungs = maxRungs
+		self.minSurvivors = minSurvivors
+
+		self.reset()
+
+	def reset(self):
+		'''
+		start a new race, to be called when a new generation is born
+		'''
+
+		self.rung = 0
+		self.nextCheck = self.firstHorizon
+		self.horizon = self.firstHorizon
+		self.numCulled = 0
+
+	def rungs(self):
+		'''
+		ticks at which the cars are ranked and culled
+		'''
+
+		ticks = []
+		tick = 0
+		horizon = self.firstHorizon
+
+		for i in range(self.maxRungs):
+			tick += horizon
+			ticks.append(int(tick))
+			horizon *= self.growth
+
+		return ticks
+
+	def update(self, cars, tick):
+		'''
+		cull the worst racing cars when the current rung horizon is over
+		returns the list of culled cars
+		'''
+
+		if (self.rung >= self.maxRungs) or (tick < self.nextCheck):
+			return []
+
+		self.rung += 1
+		self.horizon *= self.growth
+		self.nextCheck += self.horizon
+
+		culled = []
+
+		# with a track set every track races apart, so the cars of a hard track are
+		# not culled for being behind the cars of an easy one
+
+		for track in sorted(set(car.track for car in cars)):
+			racing = [car for car in cars if car.isAlive() and (car.track == track)]
+
+			keep = max(self.minSurvivors, int(math.ceil(len(racing) * (1 - self.cullFraction))))
+
+			if len(racing) <= keep:
+				continue
+
+			completion = np.array([car.completion() for car in racing])
+			order = np.argsort(-completion, kind = 'stable')
+
+			for i in order[keep:]:
+				racing[i].cull()
+				culled.append(racing[i])
+
+		self.numCulled += len(culled)
+
+		return culled
+
+	def lowerBounds(self, cars, numGenomes = None):
+		'''
+		mask of the genomes whose fitness is only a lower bound: one of their cars
+		(on any track, cars laid out track after track) was culled
+		'''
+
+		culled = np.array([car.isCulled() for car in cars], dtype = bool)
+
+		if numGenomes is None:
+			return culled
+
+		return culled.reshape(-1, numGenomes).any(axis = 0)
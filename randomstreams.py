@@ -0,0 +1,68 @@
+import numpy as np
+
+'''
+reproducible random streams
+
+all randomness goes through explicit np.random.Generator objects; every stream is
+derived from the run seed and a spawn key saying what it is for (evolution, or the
+car i of generation g), so a run gives the same results for a seed no matter how the
+work is split between workers, islands or batches
+'''
+
+EVOLUTION = 0
+SIMULATION = 1
+WORKERS = 2
+
+DEFAULT = np.random.default_rng()
+
+
+def generator(rng = None):
+
+	'''
+	the given generator, or a module wide unseeded one for callers that do not care
+	'''
+
+	if rng is None:
+		return DEFAULT
+
+	return rng
+
+
+class RandomStreams:
+
+	'''
+	factory of independent generators for a run
+	'''
+
+	def __init__(self, seed = None):
+
+		# a random seed is drawn (and can be printed) when none is given
+		self.seed = np.random.SeedSequence(seed).entropy
+
+	def stream(self, *key):
+		'''
+		generator for a given spawn key
+		'''
+
+		return np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key = key)))
+
+	def evolution(self):
+		'''
+		stream of the optimizer (sampling, crossover, mutation)
+		'''
+
+		return self.stream(EVOLUTION)
+
+	def cars(self, generation, n):
+		'''
+		one stream per car of a generation
+		'''
+
+		return [self.stream(SIMULATION, generation, i) for i in range(n)]
+
+	def spawn(self, n, *key):
+		'''
+		n independent children of a spawn key, one per worker, island or batch
+		'''
+
+		return [self.stream(WORKERS, *key, i) for i in range(n)]
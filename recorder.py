@@ -0,0 +1,186 @@
+import numpy as np
+import json
+import os
+import sys
+
+'''
+trajectory recording
+
+per tick state of the selected cars goes into preallocated ring buffers, one per column,
+which are appended to one raw file per column when full; a recording is a directory
+with those column files plus recording.json describing them, so a replay can memmap
+every column without loading the whole run
+'''
+
+HEADER = 'recording.json'
+
+
+def columns(sensorNum):
+
+	'''
+	name, dtype and width of every recorded column
+	'''
+
+	return [
+		('frame', 'int32', 1),
+		('generation', 'int32', 1),
+		('car', 'int32', 1),
+		('rank', 'int8', 1),
+		('x', 'float32', 1),
+		('y', 'float32', 1),
+		('steer', 'float32', 1),
+		('speed', 'float32', 1),
+		('sensors', 'float32', sensorNum),
+		('outputs', 'float32', 2),
+	]
+
+
+class TrajectoryRecorder:
+
+	'''
+	records the selected cars every tick
+
+	selection is 'best' (best and second best of every tick), 'all' or a list of car indices
+	'''
+
+	def __init__(self, directory, trackFile, sensorNum, selection = 'best', capacity = 4096):
+
+		os.makedirs(directory, exist_ok = True)
+
+		self.directory = directory
+		self.selection = selection
+		self.capacity = capacity
+		self.columns = columns(sensorNum)
+
+		self.buffers = {}
+
+		for name, dtype, width in self.columns:
+			shape = (capacity,) if width == 1 else (capacity, width)
+			self.buffers[name] = np.zeros(shape, dtype = dtype)
+
+		self.used = 0
+		self.frame = self.recordedFrames()
+
+		with open(os.path.join(directory, HEADER), 'w') as f:
+			json.dump({'track': trackFile, 'columns': self.columns}, f)
+
+	def recordedFrames(self):
+		'''
+		frames already in the directory, a recording can go on after a restart
+		'''
+
+		path = os.path.join(self.directory, 'frame.bin')
+
+		if not os.path.exists(path) or os.path.getsize(path) == 0:
+			return 0
+
+		frames = np.memmap(path, dtype = 'int32', mode = 'r')
+
+		return int(frames[-1]) + 1
+
+	def select(self, cars, best, secondBest):
+
+		if self.selection == 'all':
+			return [(i, 0) for i in range(len(cars)) if cars[i].isAlive()]
+
+		if self.selection == 'best':
+			selected = []
+
+			for rank, car in ((1, best), (2, secondBest)):
+				if car is not None:
+					selected.append((cars.index(car), rank))
+
+			return selected
+
+		return [(i, 0) for i in self.selection if i < len(cars)]
+
+	def record(self, cars, generation, best = None, secondBest = None):
+		'''
+		store one tick of the selected cars
+		'''
+
+		for i, rank in self.select(cars, best, secondBest):
+
+			if self.used == self.capacity:
+				self.flush()
+
+			car = cars[i]
+			k = self.used
+
+			self.buffers['frame'][k] = self.frame
+			self.buffers['generation'][k] = generation
+			self.buffers['car'][k] = i
+			self.buffers['rank'][k] = rank
+			self.buffers['x'][k] = car.cx
+			self.buffers['y'][k] = car.cy
+			self.buffers['steer'][k] = car.steer
+			self.buffers['speed'][k] = car.speed
+			self.buffers['sensors'][k] = car.sensors
+			self.buffers['outputs'][k] = car.output
+
+			self.used += 1
+
+		self.frame += 1
+
+	def flush(self):
+		'''
+		append the filled part of the buffers to the column files and start over
+		'''
+
+		for name, dtype, width in self.columns:
+			with open(os.path.join(self.directory, name + '.bin'), 'ab') as f:
+				self.buffers[name][:self.used].tofile(f)
+
+		self.used = 0
+
+	def close(self):
+		self.flush()
+
+
+class Recording:
+
+	'''
+	read-only view of a recording, every column is a memmap
+	'''
+
+	def __init__(self, directory):
+
+		path = os.path.join(directory, HEADER)
+
+		if not os.path.exists(path):
+			print("no recording found in %s" %(directory))
+			sys.exit(-1)
+
+		with open(path) as f:
+			header = json.load(f)
+
+		self.track = header['track']
+		self.data = {}
+
+		for name, dtype, width in header['columns']:
+			path = os.path.join(directory, name + '.bin')
+
+			if not os.path.exists(path) or os.path.getsize(path) == 0:
+				column = np.zeros((0,) if width == 1 else (0, width), dtype = dtype)
+			else:
+				column = np.memmap(path, dtype = dtype, mode = 'r')
+
+				if width > 1:
+					column = column.reshape(-1, width)
+
+			self.data[name] = column
+
+		# rows of every frame, frames are stored in order
+		frames = self.data['frame']
+		self.numFrames = int(frames[-1]) + 1 if len(frames) > 0 else 0
+		self.frameStart = np.searchsorted(frames, np.arange(self.numFrames + 1))
+
+	def rows(self, frame):
+		'''
+		slice of the rows recorded at a given frame
+		'''
+
+		return slice(self.frameStart[frame], self.frameStart[frame + 1])
+
+	def column(self, name):
+		return self.data[name]
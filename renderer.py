@@ -0,0 +1,182 @@
+import numpy as np
+import cv2 as cv
+import sys
+
+'''
+batched population renderer
+
+car outlines of the whole population are computed as arrays and drawn with one
+cv.polylines call per colour; the best cars get full detail (outline and sensor
+rays), the rest are drawn as outlines, dots or not at all (level of detail), so
+thousands of cars can be watched at interactive frame rates
+
+drawing can be scaled and offset (track pixels -> display pixels), and returns the
+bounding boxes of what it touched, for the compositor to restore them next frame
+'''
+
+OTHERS = ('outline', 'dots', 'none')
+
+
+def carCorners(cars, scale = 1.0, offset = (0, 0)):
+
+	'''
+	(N, 4, 2) int32 corners of every car outline, (track pixels - offset) * scale
+	'''
+
+	local = np.array([[c.x1, c.y1, c.x2, c.y2, c.x3, c.y3, c.x4, c.y4] for c in cars], dtype = float).reshape(-1, 4, 2)
+	pose = np.array([[c.cx, c.cy, c.steer] for c in cars], dtype = float)
+
+	cos = np.cos(pose[:, 2])[:, None]
+	sin = np.sin(pose[:, 2])[:, None]
+
+	x = local[:, :, 0] * cos - local[:, :, 1] * sin + pose[:, 0, None]
+	y = local[:, :, 0] * sin + local[:, :, 1] * cos + pose[:, 1, None]
+
+	if (scale != 1.0) or (offset != (0, 0)):
+		x = (x - offset[0]) * scale
+		y = (y - offset[1]) * scale
+
+	# truncation, like int() in Car.draw
+	return np.stack((x, y), axis = 2).astype(np.int32)
+
+
+class PopulationRenderer:
+
+	'''
+	draws a population: full detail for the best cars, others as outlines, dots or nothing
+	'''
+
+	DOT_SIZE = 2
+
+	def __init__(self, detail = 10, others = 'outline'):
+
+		if others not in OTHERS:
+			print("unknown level of detail %s, expecting one of %s" %(others, ", ".join(OTHERS)))
+			sys.exit(-1)
+
+		self.detail = detail
+		self.others = others
+
+	def select(self, cars, best = None, secondBest = None, top = None):
+		'''
+		indices of the cars drawn in full detail: best, second best and the
+		most advanced alive ones (or the given top cars) up to detail cars
+		'''
+
+		if len(cars) <= self.detail:
+			return np.arange(len(cars))
+
+		if top is not None:
+			ids = set(id(c) for c in top[:self.detail] + [best, secondBest])
+
+			return np.array([i for i, c in enumerate(cars) if id(c) in ids], dtype = int)
+
+		chosen = [i for i, c in enumerate(cars) if (c is best) or (c is secondBest)]
+
+		if self.detail > len(chosen):
+			alive = np.array([c.isAlive() for c in cars])
+			completion = np.array([c.completion() for c in cars])
+
+			# alive cars first, then by completion
+			order = np.lexsort((-completion, ~alive))
+			chosen += [i for i in order[:self.detail] if i not in chosen][:self.detail - len(chosen)]
+
+		return np.array(chosen, dtype = int)
+
+	def draw(self, img, cars, best = None, secondBest = None, scale = 1.0, offset = (0, 0), top = None):
+		'''
+		draw the population on img (in place), positions are (track pixels - offset) * scale
+		top, the ranked cars (see leaderboard), saves sorting the population again
+		returns the (M, 4) bounding boxes x0, y0, x1, y1 of what was drawn
+		'''
+
+		if len(cars) == 0:
+			return np.zeros((0, 4), dtype = int)
+
+		detailed = np.zeros(len(cars), dtype = bool)
+		detailed[self.select(cars, best, secondBest, top)] = True
+
+		corners = carCorners(cars, scale, offset)
+		boxes = [np.zeros((0, 4), dtype = int)]
+
+		if self.others == 'outline':
+			boxes.append(self.drawOutlines(img, cars, corners, ~detailed))
+		elif self.others == 'dots':
+			boxes.append(self.drawDots(img, cars, corners, ~detailed))
+
+		boxes.append(self.drawSensors(img, [cars[i] for i in np.flatnonzero(detailed)], scale, offset))
+		boxes.append(self.drawOutlines(img, cars, corners, detailed))
+
+		return np.concatenate(boxes)
+
+	def drawOutlines(self, img, cars, corners, mask):
+		'''
+		one polylines call per colour and thickness
+		'''
+
+		groups = {}
+		index = np.flatnonzero(mask)
+
+		for i in index:
+			groups.setdefault((cars[i].car_color, cars[i].car_thickness), []).append(i)
+
+		for (color, thickness), group in groups.items():
+			cv.polylines(img, list(corners[group]), True, color, thickness)
+
+		margin = np.array([cars[i].car_thickness for i in index], dtype = int)[:, None]
+
+		return np.column_stack((corners[index].min(axis = 1), corners[index].max(axis = 1))) + np.hstack((-margin, -margin, margin, margin))
+
+	def drawDots(self, img, cars, corners, mask):
+		'''
+		a small square at the centre of every car, set with numpy indexing
+		'''
+
+		h, w = img.shape[:2]
+		groups = {}
+		index = np.flatnonzero(mask)
+
+		# centre of the outline, already scaled
+		centres = corners.mean(axis = 1).astype(int)
+
+		for i in index:
+			groups.setdefault(cars[i].car_color, []).append(i)
+
+		for color, group in groups.items():
+			for dx in range(self.DOT_SIZE):
+				for dy in range(self.DOT_SIZE):
+					x = np.clip(centres[group, 0] + dx, 0, w - 1)
+					y = np.clip(centres[group, 1] + dy, 0, h - 1)
+					img[y, x] = color
+
+		return np.column_stack((centres[index], centres[index] + self.DOT_SIZE))
+
+	def drawSensors(self, img, cars, scale = 1.0, offset = (0, 0)):
+		'''
+		rays of the last measurement of the alive cars, all in one polylines call
+		'''
+
+		alive = [c for c in cars if c.isAlive()]
+
+		if len(alive) == 0:
+			return np.zeros((0, 4), dtype = int)
+
+		hits = np.concatenate([c.sensorHits for c in alive]).astype(float)
+
+		if (scale != 1.0) or (offset != (0, 0)):
+			hits = (hits - np.array(tuple(offset) * 2)) * scale
+
+		hits = hits.astype(np.int32)
+		radius = alive[0].SENSOR_RADIUS
+
+		cv.polylines(img, list(hits.reshape(-1, 2, 2)), False, (0, 0, 255), 1)
+
+		for px, py in hits[:, 2:]:
+			cv.circle(img, (int(px), int(py)), radius, alive[0].SENSOR_COLOR, 1)
+
+		x0 = np.minimum(hits[:, 0], hits[:, 2] - radius) - 1
+		y0 = np.minimum(hits[:, 1], hits[:, 3] - radius) - 1
+		x1 = np.maximum(hits[:, 0], hits[:, 2] + radius) + 1
+		y1 = np.maximum(hits[:, 1], hits[:, 3] + radius) + 1
+
+		return np.column_stack((x0, y0, x1, y1))
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+
+import math
+import cv2 as cv
+import sys
+import argparse
+import car
+import tools
+import tracks
+import recorder
+
+'''
+replay of a recording made with main.py --record
+
+cars are drawn from the recorded columns only, no physics, no sensors raycasting
+and no neural network are run
+
+keys: 'P' pause, 'A'/'D' one frame back/forward, '+'/'-' faster/slower, 'Q' quit
+the trackbar scrubs through the recording
+'''
+
+FRAME_DELAY = 16	# ms between two displayed frames
+
+
+def drawFrame(img, recording, frame, painter):
+
+	'''
+	draw every car recorded at a given frame, with its sensor rays
+	'''
+
+	rows = recording.rows(frame)
+
+	x = recording.column('x')[rows]
+	y = recording.column('y')[rows]
+	steer = recording.column('steer')[rows]
+	rank = recording.column('rank')[rows]
+	sensors = recording.column('sensors')[rows]
+
+	angles = painter.sensorAngles()
+
+	for k in range(len(x)):
+
+		# sensor rays from the recorded readings
+
+		sx, sy = tools.rotate(painter.sensorx, painter.sensory, steer[k])
+		sx += x[k]
+		sy += y[k]
+
+		for i in range(len(angles)):
+			d = sensors[k, i] * painter.SENSOR_DISTANCE
+			ex = int(sx + d * math.cos(angles[i] + steer[k]))
+			ey = int(sy + d * math.sin(angles[i] + steer[k]))
+			cv.line(img, (int(sx), int(sy)), (ex, ey), (0, 0, 255), 1)
+			cv.circle(img, (ex, ey), painter.SENSOR_RADIUS, painter.SENSOR_COLOR, 1)
+
+		# car contour
+
+		if rank[k] == 1:
+			painter.setBestColor()
+		elif rank[k] == 2:
+			painter.setSecondBestColor()
+		else:
+			painter.setNormalColor()
+
+		painter.setPos((x[k], y[k]))
+		painter.steer = steer[k]
+		painter.draw(img)
+
+	return img
+
+def main(directory, speed = 1.0):
+
+	recording = recorder.Recording(directory)
+
+	if recording.numFrames == 0:
+		print("empty recording")
+		sys.exit(-1)
+
+	trackManager = tracks.TrackManager()
+	trackManager.load(recording.track)
+	background = trackManager.getImage()
+
+	painter = car.Car()
+
+	cv.namedWindow('replay')
+	cv.createTrackbar('frame', 'replay', 0, max(1, recording.numFrames - 1), lambda v: None)
+
+	frame = 0.0
+	shown = 0
+	paused = False
+
+	while True:
+
+		key = chr(cv.waitKey(FRAME_DELAY) & 0xff).upper()
+
+		if (key == 'Q'):
+			break
+		elif (key == 'P'):
+			paused = not paused
+		elif (key == '+'):
+			speed *= 2
+		elif (key == '-'):
+			speed /= 2
+		elif (key == 'A'):
+			frame -= 1
+		elif (key == 'D'):
+			frame += 1
+
+		# trackbar moved by the user
+
+		pos = cv.getTrackbarPos('frame', 'replay')
+
+		if pos != shown:
+			frame = pos
+
+		frame = tools.max(0, tools.min(frame, recording.numFrames - 1))
+		shown = int(frame)
+
+		img = drawFrame(background.copy(), recording, shown, painter)
+
+		rows = recording.rows(shown)
+		generation = recording.column('generation')[rows.start] if rows.stop > rows.start else -1
+		text = "GEN=%d FRAME=%d/%d SPEED=x%.2f" %(generation, shown, recording.numFrames - 1, speed)
+		cv.putText(img, text, (10, 20), trackManager.font, trackManager.FONT_SCALE, trackManager.FONT_COLOR, 1, trackManager.fontAA)
+
+		cv.imshow('replay', img)
+		cv.setTrackbarPos('frame', 'replay', shown)
+
+		if not paused:
+			frame += speed
+
+
+if __name__ == '__main__':
+
+	parser = argparse.ArgumentParser(description = "replay a recorded training")
+	parser.add_argument("recording", help = "directory given to main.py --record")
+	parser.add_argument("--speed", type = float, default = 1.0, help = "recorded frames per displayed frame")
+	args = parser.parse_args()
+
+	main(args.recording, args.speed)
+	sys.exit(0)
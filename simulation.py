@@ -0,0 +1,302 @@
+import numpy as np
+import sys
+import genetics
+import tracks
+import profiler as profiling
+import footprint as footprints
+
+'''
+headless simulation
+
+runs generations without any window: cars are advanced tick after tick on a
+track until all of them died; with a fixed step (dt) the cars use a simulated
+clock, so results do not depend on how fast the machine is
+
+the same tick is used by main.py, which only adds drawing on top of it
+
+with a track set (see trackset.py) every genome drives one car per track and the
+cars of all the tracks share the tick
+
+cars move in substeps physics steps per tick, each one checked against the track
+(swept collision), while sensors and controllers run once per tick: a bigger dt
+with substeps simulates the same time in fewer ticks without cars going through walls
+
+collision is either the original short front sensor readings or the car footprint
+(its rotated rectangle) against the walls, checked for all the cars of a track at
+once, which also sees side and rear impacts
+'''
+
+
+class SimClock:
+
+	'''
+	simulated time source, advanced by dt every tick
+	'''
+
+	def __init__(self, dt):
+		self.dt = dt
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+	def advance(self):
+		self.now += self.dt
+
+	def reset(self):
+		self.now = 0.0
+
+
+def tickPython(cars, trackManagers, profiler, footprint = None):
+
+	'''
+	one tick of every car, phase after phase (cars do not see each other, so the
+	order does not change the results); car.track is the index of its track
+	cars whose footprint touches a wall die after moving, if footprint is given
+	'''
+
+	images = [tm.getImage() for tm in trackManagers]
+
+	with profiler.span('autopilot'):
+		for car in cars:
+			car.autopilot()
+
+	with profiler.span('apply'):
+		for car in cars:
+			car.apply()
+
+	with profiler.span('update'):
+		for car in cars:
+			car.update(images[car.track])
+
+	if footprint is not None:
+		with profiler.span('footprint'):
+			for t, trackManager in enumerate(trackManagers):
+				footprint.kill([car for car in cars if car.alive and (car.track == t)], trackManager.getOccupancy())
+
+	with profiler.span('checkForStuck'):
+		for car in cars:
+			car.checkForStuck()
+
+	with profiler.span('sense'):
+		for car in cars:
+			car.sense(images[car.track])
+
+	with profiler.span('updateDistanceToNextWaypoint'):
+		for car in cars:
+			trackManagers[car.track].updateDistanceToNextWaypoint(car)
+
+
+# engine name -> tick(cars, trackManagers, profiler, footprint)
+ENGINES = {
+	'python': tickPython,
+}
+
+COLLISIONS = ('sensors', 'footprint')
+
+
+class Simulation:
+
+	'''
+	one track (or a track set), one engine and one clock (and the profiler timing the tick phases)
+
+	dt = None keeps the wall clock, otherwise every tick advances a simulated
+	clock by dt seconds, integrated by the cars in substeps physics steps
+	'''
+
+	def __init__(self, trackFile = None, dt = None, engine = 'python', maxTicks = None, trackManager = None, profiler = None, trackSet = None, substeps = 1, collision = 'sensors'):
+
+		if engine not in ENGINES:
+			print("unknown engine %s, expecting one of %s" %(engine, ", ".join(sorted(ENGINES))))
+			sys.exit(-1)
+
+		if collision not in COLLISIONS:
+			print("unknown collision %s, expecting one of %s" %(collision, ", ".join(COLLISIONS)))
+			sys.exit(-1)
+
+		if substeps < 1:
+			print("expecting at least one physics substep per tick")
+			sys.exit(-1)
+
+		if trackSet is not None:
+			trackManager = trackSet[0]
+		elif trackManager is None:
+			trackManager = tracks.TrackManager()
+			trackManager.load(trackFile)
+
+		self.trackSet = trackSet
+		self.trackManagers = [trackManager] if trackSet is None else trackSet.managers
+		self.trackManager = trackManager
+		self.trackImg = trackManager.getImage()
+
+		self.engine = engine
+		self.substeps = substeps
+		self.collision = collision
+		self.footprint = None
+
+		if collision == 'footprint':
+			self.footprint = footprints.Footprint()
+
+		self.tickEngine = ENGINES[engine]
+		self.maxTicks = maxTicks
+
+		if profiler is None:
+			profiler = profiling.Profiler()
+
+		self.profiler = profiler
+
+		self.clock = None
+
+		if dt is not None:
+			self.clock = SimClock(dt)
+
+		self.ticks = 0
+		self.carTicks = 0
+
+		# cars being simulated and the live ones among them, dead cars are dropped
+		# from the active list so they cost nothing per tick
+		self.cars = None
+		self.active = []
+
+	def createCars(self, genomes, rngs = None):
+		'''
+		cars for a genome matrix, placed at the start of the track
+		(one car per genome and track, track after track, with a track set)
+		'''
+
+		n = len(genomes)
+		numTracks = len(self.trackManagers)
+
+		if numTracks > 1:
+			genomes = [w for t in range(numTracks) for w in genomes]
+
+			if rngs is not None:
+				rngs = list(rngs) * numTracks
+
+		cars = genetics.createCarsFromGenotypes(genomes, rngs)
+
+		for i, car in enumerate(cars):
+			car.track = i // n
+
+		self.place(cars)
+
+		return cars
+
+	def place(self, cars):
+		'''
+		put cars at the start of their track, on the simulation clock
+
+		the clock starts over, so a generation does not depend on the ticks simulated
+		before it (timeouts compared against the same floats), and the timers of the
+		cars start over with it (setClock)
+		'''
+
+		if self.clock is not None:
+			self.clock.reset()
+
+		for car in cars:
+			trackManager = self.trackManagers[car.track]
+
+			car.setPos(trackManager.getStart())
+			car.setSensorBounds(trackManager.getBounds())
+			car.substeps = self.substeps
+			car.sensorCollision = (self.collision == 'sensors')
+
+			if self.clock is not None:
+				car.setClock(self.clock)
+
+		self.cars = cars
+		self.active = list(cars)
+
+	def activate(self, cars):
+		'''
+		simulate these cars from now on (every live one is active)
+		'''
+
+		if cars is not self.cars:
+			self.cars = cars
+			self.active = list(cars)
+
+	def compact(self):
+		'''
+		drop the cars that died (or were culled) since the last tick from the active list
+		'''
+
+		self.active = [car for car in self.active if car.isAlive()]
+
+		return self.active
+
+	def allDone(self):
+		'''
+		True once every car died
+		'''
+
+		return len(self.compact()) == 0
+
+	def tick(self, cars):
+		'''
+		advance every live car one tick, returns the number of cars alive before the tick
+		'''
+
+		self.activate(cars)
+
+		if self.clock is not None:
+			self.clock.advance()
+
+		active = self.compact()
+		alive = len(active)
+
+		self.tickEngine(active, self.trackManagers, self.profiler, self.footprint)
+
+		self.ticks += 1
+		self.carTicks += alive
+
+		return alive
+
+	def run(self, cars, racer = None, maxTicks = None):
+		'''
+		tick until every car died (or maxTicks), returns the ticks simulated
+		'''
+
+		ticks = 0
+
+		if maxTicks is None:
+			maxTicks = self.maxTicks
+
+		self.activate(cars)
+
+		if racer is not None:
+			racer.reset()
+
+		while not self.allDone():
+
+			if (maxTicks is not None) and (ticks >= maxTicks):
+				break
+
+			self.tick(cars)
+			ticks += 1
+
+			if racer is not None:
+				racer.update(cars, ticks)
+
+		return ticks
+
+	def fitness(self, cars):
+		'''
+		fitness of every genome: its completion, aggregated over the tracks of a track set
+		'''
+
+		if self.trackSet is None:
+			return np.array([car.completion() for car in cars], dtype = np.float64)
+
+		return self.trackSet.fitness(cars)
+
+	def evaluate(self, genomes, rngs = None, racer = None):
+		'''
+		run a whole generation headless, returns its cars once they all died
+		'''
+
+		cars = self.createCars(genomes, rngs)
+		self.run(cars, racer)
+
+		return cars
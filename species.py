@@ -0,0 +1,209 @@
+import numpy as np
+import sys
+
+'''
+speciation
+
+genomes are grouped in species by compatibility distance (root mean square difference
+of their genes), fitness is shared inside every species and children are bred inside
+their own species, so one lineage cannot take the whole population
+
+distances are computed as whole matrices with the gram trick
+||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, by chunks of rows for big populations
+'''
+
+DISTANCE_CHUNK_ROWS = 1024
+
+
+def distanceMatrix(a, b, chunk = DISTANCE_CHUNK_ROWS):
+
+	'''
+	(len(a), len(b)) matrix of compatibility distances between the rows of a and b
+	'''
+
+	a = np.asarray(a, dtype = np.float64)
+	b = np.asarray(b, dtype = np.float64)
+
+	distances = np.empty((a.shape[0], b.shape[0]))
+	bb = np.sum(b * b, axis = 1)
+
+	for i in range(0, a.shape[0], chunk):
+		ai = a[i:i + chunk]
+		d2 = np.sum(ai * ai, axis = 1)[:, None] + bb[None, :] - 2 * (ai @ b.T)
+		distances[i:i + chunk] = np.sqrt(np.maximum(d2, 0) / max(1, a.shape[1]))
+
+	return distances
+
+def pairwiseDistances(genomes, chunk = DISTANCE_CHUNK_ROWS):
+
+	'''
+	(N, N) compatibility distance matrix of a population
+	'''
+
+	distances = distanceMatrix(genomes, genomes, chunk)
+	np.fill_diagonal(distances, 0)
+
+	return distances
+
+
+class Speciation:
+
+	'''
+	keeps one representative genome per species between generations
+
+	a genome joins the species of its nearest representative if it is closer than
+	threshold, otherwise it founds a new one; the threshold moves to keep about
+	targetSpecies species
+	'''
+
+	def __init__(self, threshold = 0.5, targetSpecies = 5, thresholdStep = 0.05):
+
+		if (threshold <= 0):
+			print("compatibility threshold must be positive")
+			sys.exit(-1)
+
+		self.threshold = threshold
+		self.targetSpecies = targetSpecies
+		self.thresholdStep = thresholdStep
+
+		self.representatives = None
+		self.speciesIds = np.zeros(0, dtype = np.int64)
+		self.nextId = 0
+
+	def getState(self):
+		'''
+		dict of arrays to save the species between runs
+		'''
+
+		state = {'speciesThreshold': np.asarray(self.threshold), 'speciesIds': self.speciesIds, 'speciesNextId': np.asarray(self.nextId)}
+
+		if self.representatives is not None:
+			state['speciesRepresentatives'] = self.representatives
+
+		return state
+
+	def setState(self, state):
+
+		if 'speciesThreshold' in state:
+			self.threshold = float(state['speciesThreshold'])
+			self.speciesIds = np.asarray(state['speciesIds'], dtype = np.int64)
+			self.nextId = int(state['speciesNextId'])
+
+		if 'speciesRepresentatives' in state:
+			self.representatives = np.asarray(state['speciesRepresentatives'], dtype = np.float64)
+
+	def numSpecies(self):
+		return len(self.speciesIds)
+
+	def assign(self, genomes):
+		'''
+		returns the species id of every genome and updates the representatives
+		'''
+
+		genomes = np.asarray(genomes, dtype = np.float64)
+		n = genomes.shape[0]
+
+		labels = np.full(n, -1, dtype = np.int64)
+
+		# join existing species, one (N, S) distance matrix
+
+		if self.representatives is not None and len(self.speciesIds) > 0:
+			d = distanceMatrix(genomes, self.representatives)
+			nearest = np.argmin(d, axis = 1)
+			close = d[np.arange(n), nearest] < self.threshold
+			labels[close] = self.speciesIds[nearest[close]]
+
+		# the rest found new species, leaders picked greedily among them
+
+		orphans = np.flatnonzero(labels < 0)
+
+		if orphans.size > 0:
+			d = pairwiseDistances(genomes[orphans])
+			free = np.ones(orphans.size, dtype = bool)
+
+			for i in range(orphans.size):
+				if free[i]:
+					members = free & (d[i] < self.threshold)
+					members[i] = True
+					labels[orphans[members]] = self.nextId
+					free[members] = False
+					self.nextId += 1
+
+		self.updateRepresentatives(genomes, labels)
+		self.adaptThreshold()
+
+		return labels
+
+	def updateRepresentatives(self, genomes, labels):
+		'''
+		every surviving species is represented by its member closest to the old representative
+		(or its first member if new), extinct species are dropped
+		'''
+
+		ids = np.unique(labels)
+		representatives = np.empty((len(ids), genomes.shape[1]))
+
+		old = {}
+
+		if self.representatives is not None:
+			for k in range(len(self.speciesIds)):
+				old[int(self.speciesIds[k])] = self.representatives[k]
+
+		for k in range(len(ids)):
+			members = genomes[labels == ids[k]]
+
+			if int(ids[k]) in old:
+				d = np.sum((members - old[int(ids[k])]) ** 2, axis = 1)
+				representatives[k] = members[np.argmin(d)]
+			else:
+				representatives[k] = members[0]
+
+		self.speciesIds = ids
+		self.representatives = representatives
+
+	def adaptThreshold(self):
+
+		if self.targetSpecies is None:
+			return
+
+		if self.numSpecies() > self.targetSpecies:
+			self.threshold += self.thresholdStep
+		elif self.numSpecies() < self.targetSpecies:
+			self.threshold = max(self.thresholdStep, self.threshold - self.thresholdStep)
+
+
+def sharedFitness(fitness, labels):
+
+	'''
+	fitness divided by the size of its species
+	'''
+
+	ids, inverse, counts = np.unique(labels, return_inverse = True, return_counts = True)
+
+	return np.asarray(fitness, dtype = np.float64) / counts[inverse]
+
+def offspringCounts(fitness, labels, numchildren):
+
+	'''
+	children per species, proportional to the summed shared fitness of every species
+	returns (species ids, counts)
+	'''
+
+	shared = sharedFitness(fitness, labels)
+	ids, inverse = np.unique(labels, return_inverse = True)
+
+	total = np.bincount(inverse, weights = shared)
+	total = total - min(0, total.min())
+
+	if total.sum() <= 0:
+		total = np.ones(len(ids))
+
+	quota = numchildren * total / total.sum()
+	counts = np.floor(quota).astype(np.int64)
+
+	# give the remainder to the largest fractions
+
+	remainder = numchildren - counts.sum()
+	counts[np.argsort(-(quota - counts), kind = 'stable')[:remainder]] += 1
+
+	return ids, counts
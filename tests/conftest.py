@@ -0,0 +1,38 @@
+import os
+import sys
+
+'''
+the modules live at the root of the repository, next to this directory
+
+helpers shared by the tests, imported with from conftest import ...
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+import simulation
+
+TRACK_FILE = os.path.join(ROOT, 'tracks', 'track1_wp.png')
+
+
+def createSimulation(maxTicks = 200):
+
+	'''
+	headless simulation of the default track with a simulated clock
+	'''
+
+	return simulation.Simulation(TRACK_FILE, dt = 1 / 30.0, maxTicks = maxTicks)
+
+def simulateGeneration(sim, optimizer, streams):
+
+	'''
+	one generation of a run (ask, race every car, tell), returns its fitness
+	'''
+
+	genomes = optimizer.ask()
+	cars = sim.evaluate(genomes, streams.cars(optimizer.generation, len(genomes)))
+	fitness = sim.fitness(cars)
+	optimizer.tell(genomes, fitness)
+
+	return fitness
@@ -0,0 +1,120 @@
+import os
+import numpy as np
+import pytest
+import checkpoint
+import genetics
+import optimizers
+import randomstreams
+from conftest import createSimulation, simulateGeneration
+
+'''
+checkpoints give back the run they were taken from
+'''
+
+
+def fakeFitness(genomes):
+
+	'''
+	deterministic fitness standing for a simulation
+	'''
+
+	return -np.sum((genomes - 0.3) ** 2, axis = 1)
+
+def evolve(optimizer, generations):
+
+	for generation in range(generations):
+		genomes = optimizer.ask()
+		optimizer.tell(genomes, fakeFitness(genomes))
+
+def test_roundTrip(tmp_path):
+
+	filename = os.path.join(str(tmp_path), 'checkpoint.npz')
+
+	for name in sorted(optimizers.OPTIMIZERS):
+		streams = randomstreams.RandomStreams(7)
+		optimizer = optimizers.createOptimizer(name, 12, 8, streams.evolution())
+		evolve(optimizer, 3)
+
+		checkpoint.write(filename, checkpoint.snapshot(optimizer, streams))
+		restored, restoredStreams = checkpoint.restore(checkpoint.load(filename))
+
+		assert restored.name == name
+		assert restored.generation == optimizer.generation
+		assert restoredStreams.seed == streams.seed
+
+		state = optimizer.getState()
+		restoredState = restored.getState()
+
+		assert sorted(state) == sorted(restoredState), name
+
+		for key in state:
+			assert np.array_equal(state[key], restoredState[key]), (name, key)
+
+		# same generator state, so the same next generation
+		assert np.array_equal(optimizer.ask(), restored.ask()), name
+
+def test_resumeIsIdentical(tmp_path):
+
+	'''
+	a run checkpointed and resumed (in a new simulation, as a new process would)
+	gives the fitness of the uninterrupted one, generation after generation
+	'''
+
+	filename = os.path.join(str(tmp_path), 'checkpoint.npz')
+
+	for name in sorted(optimizers.OPTIMIZERS):
+		runs = []
+
+		for split in (None, 2):
+			sim = createSimulation()
+			streams = randomstreams.RandomStreams(3)
+			optimizer = optimizers.createOptimizer(name, genetics.genotypeDimension(), 8, streams.evolution())
+			fitness = []
+
+			for generation in range(4):
+				if generation == split:
+					checkpoint.write(filename, checkpoint.snapshot(optimizer, streams))
+					optimizer, streams = checkpoint.restore(checkpoint.load(filename))
+					sim = createSimulation()
+
+				fitness.append(simulateGeneration(sim, optimizer, streams))
+
+			runs.append(np.array(fitness))
+
+		assert np.array_equal(runs[0], runs[1]), name
+
+def test_configChecked(tmp_path):
+
+	filename = os.path.join(str(tmp_path), 'checkpoint.npz')
+	config = {'tracks': ['a.png', 'b.png'], 'dt': 1 / 30.0, 'racing': None}
+
+	streams = randomstreams.RandomStreams(7)
+	optimizer = optimizers.createOptimizer('ga', 12, 8, streams.evolution())
+	evolve(optimizer, 1)
+
+	checkpoint.write(filename, checkpoint.snapshot(optimizer, streams, config = config))
+	state = checkpoint.load(filename)
+
+	checkpoint.checkConfig(state, dict(config))
+
+	with pytest.raises(SystemExit):
+		checkpoint.checkConfig(state, dict(config, dt = 1 / 15.0))
+
+	with pytest.raises(SystemExit):
+		checkpoint.checkConfig(state, dict(config, tracks = ['a.png']))
+
+def test_writerErrorSurfaces(tmp_path):
+
+	streams = randomstreams.RandomStreams(7)
+	optimizer = optimizers.createOptimizer('ga', 12, 8, streams.evolution())
+	evolve(optimizer, 1)
+
+	writer = checkpoint.CheckpointWriter(os.path.join(str(tmp_path), 'nodir', 'checkpoint.npz'), 1)
+	writer.save(optimizer, streams)
+	writer.queue.join()
+
+	with pytest.raises(SystemExit):
+		writer.save(optimizer, streams)
+
+	with pytest.raises(SystemExit):
+		writer.close()
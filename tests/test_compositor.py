@@ -0,0 +1,35 @@
+import numpy as np
+import compositor
+import randomstreams
+import renderer
+import genetics
+from conftest import createSimulation
+
+'''
+a frame restored tile by tile is the frame a full redraw gives
+'''
+
+
+def test_frameEqualsFullRedraw():
+
+	streams = randomstreams.RandomStreams(0)
+	sim = createSimulation(None)
+
+	genomes = streams.evolution().uniform(-1, 1, (20, genetics.genotypeDimension()))
+	cars = sim.createCars(genomes, streams.cars(0, len(genomes)))
+
+	background = sim.trackManager.getImage()
+	composite = compositor.Compositor(background, compositor.displaySize(background, (1280, 720)))
+	populationRenderer = renderer.PopulationRenderer(detail = 5)
+
+	for frame in range(30):
+		for tick in range(3):
+			sim.tick(cars)
+
+		img = composite.restore()
+		composite.mark(populationRenderer.draw(img, cars, cars[0], cars[1], composite.scale))
+
+		expected = composite.background.copy()
+		populationRenderer.draw(expected, cars, cars[0], cars[1], composite.scale)
+
+		assert np.array_equal(img, expected), frame
@@ -0,0 +1,81 @@
+import io
+import os
+import numpy as np
+import genetics
+import lineage
+import optimizers
+import randomstreams
+
+'''
+an archive written, closed and opened again rebuilds every genome it stored
+'''
+
+
+def fill(filename, name, quantize, generations = 40):
+
+	'''
+	archive the genomes of a short run without simulation, returns every genome appended
+	'''
+
+	archive = lineage.LineageArchive(filename, quantize)
+	streams = randomstreams.RandomStreams(3)
+	optimizer = optimizers.createOptimizer(name, genetics.genotypeDimension(), 12, streams.evolution())
+	genomes = []
+
+	for generation in range(generations):
+		population = np.array(optimizer.ask())
+		fitness = streams.evolution().random(len(population))
+		optimizer.tell(population, fitness)
+
+		archive.append(population, fitness)
+		genomes.append(population)
+
+	return np.concatenate(genomes)
+
+def test_roundTrip(tmp_path):
+
+	for name in ('ga', 'cmaes'):
+		for quantize in (False, True):
+			filename = str(tmp_path / ('%s_%d.lineage' %(name, quantize)))
+			genomes = fill(filename, name, quantize)
+
+			archive = lineage.LineageArchive(filename, quantize)
+			assert archive.size() == len(genomes)
+
+			rebuilt = np.array([archive.genome(i) for i in range(archive.size())])
+
+			if quantize:
+				# one float16 step of the largest delta a patch can hold
+				step = float(np.spacing(np.float16(2 * np.max(np.abs(genomes)))))
+				assert np.max(np.abs(rebuilt - genomes)) <= step, name
+			else:
+				assert np.array_equal(rebuilt, genomes), name
+
+def test_deltasSaveRoom(tmp_path):
+
+	'''
+	cma-es samples share no genes with their parents: without quantization every
+	generation is a keyframe chunk, no larger than its genomes and fitness saved raw
+	'''
+
+	filename = str(tmp_path / 'cmaes.lineage')
+	genomes = fill(filename, 'cmaes', False)
+
+	archive = lineage.LineageArchive(filename)
+	assert np.all(archive.parents < 0)
+
+	raw = io.BytesIO()
+
+	for generation in range(len(archive.chunks)):
+		population = genomes[generation * 12:(generation + 1) * 12]
+		np.save(raw, np.zeros(5, dtype = np.int64))
+		np.save(raw, np.zeros(len(population)))
+		np.save(raw, population)
+
+	assert os.path.getsize(filename) <= len(raw.getvalue())
+
+	# ga children are mostly their parents genes, stored as deltas
+	filename = str(tmp_path / 'ga.lineage')
+	genomes = fill(filename, 'ga', False)
+
+	assert os.path.getsize(filename) < genomes.nbytes
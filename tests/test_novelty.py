@@ -0,0 +1,55 @@
+import numpy as np
+import novelty
+
+'''
+kd-tree nearest neighbours against a brute force scan
+'''
+
+
+def bruteForce(points, queries, k):
+
+	'''
+	(N, k) sorted distances to the k nearest points of every query
+	'''
+
+	d = np.sqrt(np.sum((queries[:, None, :] - points[None, :, :]) ** 2, axis = 2))
+
+	return np.sort(d, axis = 1)[:, :k]
+
+def test_kdTreeKnn():
+
+	rng = np.random.default_rng(0)
+	points = rng.random((500, 4))
+	queries = rng.random((50, 4))
+
+	tree = novelty.KDTree(points)
+	archive = novelty.NoveltyArchive()
+
+	assert np.allclose(archive.knnDistances(queries, 5, tree), bruteForce(points, queries, 5))
+
+def test_archiveKnn():
+
+	rng = np.random.default_rng(1)
+	archive = novelty.NoveltyArchive()
+
+	# batches of different sizes, so trees get merged
+	for n in (20, 20, 7, 100, 3, 64):
+		archive.add(rng.random((n, 3)))
+
+	population = rng.random((30, 3))
+	queries = rng.random((40, 3))
+
+	points = np.vstack((archive.getPoints(), population))
+
+	assert archive.size() == 214
+	assert np.allclose(archive.knnDistances(queries, 10, novelty.KDTree(population)), bruteForce(points, queries, 10))
+
+def test_missingNeighbours():
+
+	archive = novelty.NoveltyArchive()
+	archive.add(np.zeros((2, 2)))
+
+	distances = archive.knnDistances(np.ones((1, 2)), 4)
+
+	assert np.allclose(distances[0, :2], np.sqrt(2))
+	assert np.all(np.isnan(distances[0, 2:]))
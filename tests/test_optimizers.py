@@ -0,0 +1,29 @@
+import numpy as np
+import optimizers
+
+'''
+optimizers on a known problem, without any simulation
+'''
+
+
+def sphere(genomes, optimum):
+
+	'''
+	fitness (maximized) of a shifted sphere, 0 at the optimum
+	'''
+
+	return -np.sum((genomes - optimum) ** 2, axis = 1)
+
+def test_cmaesSphere():
+
+	optimum = np.linspace(-0.8, 0.8, 10)
+
+	for name in ('cmaes', 'sepcmaes'):
+		optimizer = optimizers.createOptimizer(name, 10, 12, np.random.default_rng(0))
+
+		for generation in range(200):
+			genomes = optimizer.ask()
+			optimizer.tell(genomes, sphere(genomes, optimum))
+
+		assert optimizer.getBest()[1] > -1e-10, name
+		assert np.allclose(optimizer.mean, optimum, atol = 1e-6), name
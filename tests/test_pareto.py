@@ -0,0 +1,109 @@
+import numpy as np
+import pareto
+
+'''
+NSGA-II ranking against a brute force dominance sort
+'''
+
+
+class StubCar:
+
+	'''
+	the car attributes carObjectives reads
+	'''
+
+	def __init__(self, completion, trackCompletion, progressTime, odometer):
+		self.value = completion
+		self.trackCompletion = trackCompletion
+		self.progressTime = progressTime
+		self.odometer = odometer
+
+	def completion(self):
+		return self.value
+
+def bruteForceFronts(f):
+
+	'''
+	front of every individual, peeling the non-dominated ones pair by pair
+	'''
+
+	n = len(f)
+	fronts = np.full(n, -1)
+	remaining = set(range(n))
+	k = 0
+
+	while remaining:
+		front = [i for i in remaining if not any(np.all(f[j] <= f[i]) and np.any(f[j] < f[i]) for j in remaining)]
+
+		for i in front:
+			fronts[i] = k
+
+		remaining -= set(front)
+		k += 1
+
+	return fronts
+
+def bruteForceCrowding(f, fronts):
+
+	'''
+	crowding distance of every individual inside its front
+	'''
+
+	n, m = f.shape
+	distance = np.zeros(n)
+
+	for k in range(fronts.max() + 1):
+		members = [i for i in range(n) if fronts[i] == k]
+
+		for j in range(m):
+			ordered = sorted(members, key = lambda i: f[i, j])
+			span = f[ordered[-1], j] - f[ordered[0], j]
+
+			if span == 0:
+				span = 1
+
+			distance[ordered[0]] = np.inf
+			distance[ordered[-1]] = np.inf
+
+			for a in range(1, len(ordered) - 1):
+				distance[ordered[a]] += (f[ordered[a + 1], j] - f[ordered[a - 1], j]) / span
+
+	return distance
+
+def test_rankMatchesBruteForce():
+
+	rng = np.random.default_rng(0)
+
+	for trial in range(20):
+		# integer objectives, so there are ties and duplicates too
+		f = rng.integers(0, 6, (int(rng.integers(2, 40)), int(rng.integers(2, 4)))).astype(np.float64)
+
+		fronts = bruteForceFronts(f)
+		crowding = bruteForceCrowding(f, fronts)
+
+		assert np.array_equal(pareto.nonDominatedSort(f), fronts)
+		assert np.allclose(pareto.crowdingDistance(f, fronts), crowding)
+
+		order = pareto.rank(f)
+
+		assert sorted(order) == list(range(len(f)))
+
+		# lower front first, then larger crowding distance
+		for a, b in zip(order[:-1], order[1:]):
+			assert (fronts[a] < fronts[b]) or ((fronts[a] == fronts[b]) and (crowding[a] >= crowding[b]))
+
+def test_stalledCarsNotOnFirstFront():
+
+	cars = [
+		StubCar(0.0, 0.0, 0.0, 0.0),		# never moved
+		StubCar(0.02, 0.0, 0.0, 100.0),		# drove around, never crossed a waypoint
+		StubCar(0.3, 0.25, 5.0, 300.0),
+		StubCar(0.5, 0.5, 8.0, 600.0),
+	]
+
+	fronts = pareto.nonDominatedSort(pareto.carObjectives(cars))
+
+	assert fronts[0] > 0
+	assert fronts[1] > 0
+	assert fronts[2] == 0
+	assert fronts[3] == 0
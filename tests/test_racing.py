@@ -0,0 +1,86 @@
+import numpy as np
+import genetics
+import racing
+import randomstreams
+import simulation
+from conftest import createSimulation
+
+'''
+culled cars stop where they are and their genomes are reported as lower bounds
+'''
+
+
+def test_culledCarsAreFrozen():
+
+	streams = randomstreams.RandomStreams(0)
+	sim = createSimulation(None)
+
+	genomes = streams.evolution().uniform(-1, 1, (10, genetics.genotypeDimension()))
+	cars = sim.createCars(genomes, streams.cars(0, len(genomes)))
+
+	for tick in range(20):
+		sim.tick(cars)
+
+	alive = [car for car in cars if car.isAlive()]
+	assert len(alive) > 0
+
+	car = alive[0]
+	car.cull()
+
+	pos = car.getPos()
+	completion = car.completion()
+
+	# straight through the engine, not only dropped from the active cars
+	for tick in range(20):
+		sim.clock.advance()
+		simulation.tickPython([car], sim.trackManagers, sim.profiler)
+
+	assert car.getPos() == pos
+	assert car.completion() == completion
+
+def test_lowerBoundsPerGenome():
+
+	class StubCar:
+		def __init__(self, culled):
+			self.culled = culled
+
+		def isCulled(self):
+			return self.culled
+
+	racer = racing.SuccessiveHalving()
+
+	# two tracks of three genomes, genome 1 culled on the first track, genome 2 on the second
+	cars = [StubCar(c) for c in (False, True, False, False, False, True)]
+
+	assert list(racer.lowerBounds(cars)) == [False, True, False, False, False, True]
+	assert list(racer.lowerBounds(cars, 3)) == [False, True, True]
+
+def test_cullPerTrack():
+
+	class StubCar:
+		def __init__(self, track, completion):
+			self.track = track
+			self.value = completion
+			self.alive = True
+			self.culled = False
+
+		def completion(self):
+			return self.value
+
+		def isAlive(self):
+			return self.alive
+
+		def cull(self):
+			self.alive = False
+			self.culled = True
+
+	# an easy track where every car is ahead of every car of a hard track
+	easy = [StubCar(0, 0.5 + 0.1 * i) for i in range(4)]
+	hard = [StubCar(1, 0.01 * i) for i in range(4)]
+
+	racer = racing.SuccessiveHalving(firstHorizon = 10, cullFraction = 0.5)
+	culled = racer.update(easy + hard, 10)
+
+	assert len(culled) == 4
+	assert [car.culled for car in easy] == [True, True, False, False]
+	assert [car.culled for car in hard] == [True, True, False, False]
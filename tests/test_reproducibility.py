@@ -0,0 +1,56 @@
+import numpy as np
+import genetics
+import optimizers
+import randomstreams
+from conftest import createSimulation, simulateGeneration
+
+'''
+the same seed gives the same run
+'''
+
+
+def run(name, seed, generations = 3):
+
+	'''
+	fitness of every generation of a short headless run
+	'''
+
+	sim = createSimulation()
+	streams = randomstreams.RandomStreams(seed)
+	optimizer = optimizers.createOptimizer(name, genetics.genotypeDimension(), 8, streams.evolution())
+	fitness = []
+
+	for generation in range(generations):
+		fitness.append(simulateGeneration(sim, optimizer, streams))
+
+	return np.array(fitness), optimizer.getBest()[0]
+
+def test_sameSeed():
+
+	for name in sorted(optimizers.OPTIMIZERS):
+		fitness, best = run(name, 11)
+		again, bestAgain = run(name, 11)
+
+		assert np.array_equal(fitness, again), name
+		assert np.array_equal(best, bestAgain), name
+
+def test_otherSeed():
+
+	fitness, best = run('ga', 11)
+	other, bestOther = run('ga', 12)
+
+	assert not np.array_equal(best, bestOther)
+
+def test_streamsIndependentOfOrder():
+
+	'''
+	a car stream only depends on its generation and index, not on what was drawn before
+	'''
+
+	streams = randomstreams.RandomStreams(5)
+	first = [rng.random() for rng in streams.cars(4, 6)]
+
+	streams.evolution().random(100)
+
+	assert first == [rng.random() for rng in streams.cars(4, 6)]
+	assert first[2:] == [rng.random() for rng in streams.cars(4, 6)[2:]]
@@ -0,0 +1,69 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import videoexport
+
+'''
+the exporter fails loudly instead of reporting frames it never wrote
+'''
+
+
+def frame(i):
+	return np.full((48, 64, 3), i % 256, dtype = np.uint8)
+
+def test_images(tmp_path):
+
+	exporter = videoexport.VideoExporter(os.path.join(str(tmp_path), '%03d.png'), policy = 'block')
+
+	for i in range(5):
+		exporter.push(frame(i))
+
+	exporter.close()
+
+	assert exporter.written == 5
+	assert sorted(os.listdir(str(tmp_path))) == ['%03d.png' %(i) for i in range(5)]
+
+def test_video(tmp_path):
+
+	filename = os.path.join(str(tmp_path), 'run.avi')
+	exporter = videoexport.VideoExporter(filename, policy = 'block')
+
+	for i in range(5):
+		exporter.push(frame(i))
+
+	exporter.close()
+
+	assert exporter.written == 5
+	assert os.path.getsize(filename) > 0
+
+def test_missingDirectory(tmp_path):
+
+	with pytest.raises(SystemExit):
+		videoexport.VideoExporter(os.path.join(str(tmp_path), 'nodir', '%06d.png'))
+
+	with pytest.raises(SystemExit):
+		videoexport.VideoExporter(os.path.join(str(tmp_path), 'nodir', 'run.avi'))
+
+def test_failedWriteStopsWaiting(tmp_path):
+
+	directory = os.path.join(str(tmp_path), 'frames')
+	os.mkdir(directory)
+
+	exporter = videoexport.VideoExporter(os.path.join(directory, '%06d.png'), policy = 'block', queueSize = 1)
+
+	shutil.rmtree(directory)
+
+	# the writer dies on the first frame, pushing on a full queue must not hang
+	for i in range(20):
+		exporter.push(frame(i))
+
+	exporter.thread.join(5)
+
+	assert not exporter.thread.is_alive()
+
+	with pytest.raises(SystemExit):
+		exporter.close()
+
+	assert exporter.written == 0
+	assert exporter.error is not None
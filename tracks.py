@@ -153,8 +153,12 @@ class TrackManager:
 
 		'''
 		update car stats based on % of completion of current waypoint
+		a culled car keeps the completion it had when it was stopped
 		'''
 
+		if car.isCulled():
+			return
+
 		completion = self.getWayPointCompletion(car)
 
 		if (completion == 1):
@@ -213,6 +217,7 @@ class TrackManager:
 		blackFilter = cv.bitwise_and(white, white, mask = mask)
 
 		self.trackImage = blackFilter
+		self.occupancy = None
 
 
 	def detectStart(self):
@@ -288,23 +293,28 @@ class TrackManager:
 		return self.trackImage
 
 
+	def getOccupancy(self):
+		'''
+		boolean grid, True where there is no track (the walls for Car.checkColor)
+		'''
+
+		if self.occupancy is None:
+			self.occupancy = np.all(self.trackImage != 255, axis = 2)
+
+		return self.occupancy
+
 	def getBounds(self):
 		return self.trackImage.shape[1], self.trackImage.shape[0]
 
 	def printData(self, img, car, x, y):
 		'''
-		prints stats for a given car
+		prints stats for a given car, returns the width and height of the text
 		'''
 
-		posy = y
-
-		text = "POS=(%d, %d)" %(car.cx, car.cy) + " WPI=%d WPC=%d%% TC=%d%% C=%.1f%% M=%d" %(car.waypointIndex, 100 * car.currentWayPointCompletion, 100 * car.trackCompletion, 100.0 * car.completion(), car.getTimer())
-		cv.putText(img, text, (x, posy), self.font, self.FONT_SCALE, self.FONT_COLOR, 1, self.fontAA)
-		posy += self.fontSize
+		lines = []
 
-		text = "T=%d%%" %(int(car.throttle * 100)) + " ODO=%d " %(int(car.odometer)) + "SPD=%.2f TR=%.2f ST=%d" %(car.speed, car.turn_ratio, car.steer * 180 / math.pi)
-		cv.putText(img, text, (x, posy), self.font, self.FONT_SCALE, self.FONT_COLOR, 1, self.fontAA)
-		posy += self.fontSize
+		lines.append("POS=(%d, %d)" %(car.cx, car.cy) + " WPI=%d WPC=%d%% TC=%d%% C=%.1f%% M=%d" %(car.waypointIndex, 100 * car.currentWayPointCompletion, 100 * car.trackCompletion, 100.0 * car.completion(), car.getTimer()))
+		lines.append("T=%d%%" %(int(car.throttle * 100)) + " ODO=%d " %(int(car.odometer)) + "SPD=%.2f TR=%.2f ST=%d" %(car.speed, car.turn_ratio, car.steer * 180 / math.pi))
 
 		text = "S=[ "
 
@@ -312,12 +322,19 @@ class TrackManager:
 			text += "%.2f " %(car.sensors[i])
 		
 		text += "] C=%d" %(car.collision())
-		cv.putText(img, text, (x, posy), self.font, self.FONT_SCALE, self.FONT_COLOR, 1, self.fontAA)
-		posy += self.fontSize
+		lines.append(text)
+
+		lines.append("O=[%.2f %.2f]"  %(car.output[0], car.output[1]))
+
+		posy = y
+		width = 0
+
+		for text in lines:
+			cv.putText(img, text, (x, posy), self.font, self.FONT_SCALE, self.FONT_COLOR, 1, self.fontAA)
+			width = max(width, cv.getTextSize(text, self.font, self.FONT_SCALE, 1)[0][0])
+			posy += self.fontSize
 
-		text = "O=[%.2f %.2f]"  %(car.output[0], car.output[1])
-		cv.putText(img, text, (x, posy), self.font, self.FONT_SCALE, self.FONT_COLOR, 1, self.fontAA)		
-		posy += self.fontSize
+		return width, posy - y
 
 
 	def showTrack(self):
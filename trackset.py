@@ -0,0 +1,91 @@
+import numpy as np
+import sys
+import tracks
+
+'''
+several tracks evaluated at once
+
+every genome drives one car on every track; the cars of all the tracks are advanced
+by the same tick (see simulation.tickPython), so another track adds cars to the
+batch instead of another pass over the generation
+
+cars are laid out track after track: car t * N + i is genome i on track t
+
+the fitness of a genome aggregates its completions over the tracks: the mean, the
+worst one (min) or a weighted mean
+'''
+
+AGGREGATES = ('mean', 'min', 'weighted')
+
+
+class TrackSet:
+
+	'''
+	the tracks a population is evaluated on and how their completions are aggregated
+	'''
+
+	def __init__(self, trackFiles, aggregate = 'mean', weights = None):
+
+		if len(trackFiles) == 0:
+			print("expecting at least one track")
+			sys.exit(-1)
+
+		if aggregate not in AGGREGATES:
+			print("unknown aggregate %s, expecting one of %s" %(aggregate, ", ".join(AGGREGATES)))
+			sys.exit(-1)
+
+		if aggregate == 'weighted':
+			if (weights is None) or (len(weights) != len(trackFiles)):
+				print("weighted aggregate expects one weight per track")
+				sys.exit(-1)
+
+			weights = np.asarray(weights, dtype = np.float64)
+
+			if np.any(weights < 0) or (np.sum(weights) <= 0):
+				print("track weights must be positive")
+				sys.exit(-1)
+
+			weights = weights / np.sum(weights)
+
+		self.files = list(trackFiles)
+		self.aggregate = aggregate
+		self.weights = weights
+		self.managers = []
+
+		for filename in self.files:
+			trackManager = tracks.TrackManager()
+			trackManager.load(filename)
+			self.managers.append(trackManager)
+
+	def __len__(self):
+		return len(self.managers)
+
+	def __getitem__(self, i):
+		return self.managers[i]
+
+	def completions(self, cars):
+		'''
+		(tracks, genomes) matrix of the completion of every car
+		'''
+
+		return np.array([car.completion() for car in cars], dtype = np.float64).reshape(len(self.managers), -1)
+
+	def fitness(self, cars):
+		'''
+		aggregated completion of every genome
+		'''
+
+		return self.combine(self.completions(cars))
+
+	def combine(self, completion):
+		'''
+		aggregate a (tracks, genomes) matrix of completions (or any score) into one per genome
+		'''
+
+		if self.aggregate == 'min':
+			return np.min(completion, axis = 0)
+
+		if self.aggregate == 'weighted':
+			return self.weights @ completion
+
+		return np.mean(completion, axis = 0)
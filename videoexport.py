@@ -0,0 +1,206 @@
+import cv2 as cv
+import os
+import queue
+import sys
+import threading
+
+'''
+background video export
+
+frames are copied into a bounded queue and encoded on a writer thread, so neither
+the simulation nor the display loop waits for the encoder; when the queue is full
+frames are dropped (policy 'drop') or the caller waits for room (policy 'block')
+
+the output is a video (.avi as MJPG, .mp4 as mp4v) or, if the filename holds a
+printf pattern like frames/%06d.png, one image per frame
+
+the output is checked when the exporter is created; a write failing later stops
+the writer thread, frames are then dropped and close reports the error
+'''
+
+POLICIES = ('drop', 'block')
+VIEWS = ('track', 'zoom')
+
+FOURCC = {
+	'.avi': 'MJPG',
+	'.mp4': 'mp4v',
+}
+
+# frame size of the writer opened to check a video can be written at all
+PROBE_SIZE = (64, 64)
+
+# seconds between checks that the writer thread is still alive while waiting on the queue
+WAIT = 0.1
+
+
+class VideoExporter:
+
+	'''
+	encodes every Nth frame of a view on a background thread
+	'''
+
+	def __init__(self, filename, fps = 30, every = 1, view = 'track', policy = 'drop', queueSize = 64):
+
+		if policy not in POLICIES:
+			print("unknown export policy %s, expecting one of %s" %(policy, ", ".join(POLICIES)))
+			sys.exit(-1)
+
+		if view not in VIEWS:
+			print("unknown export view %s, expecting one of %s" %(view, ", ".join(VIEWS)))
+			sys.exit(-1)
+
+		self.images = '%' in filename
+		extension = os.path.splitext(filename)[1].lower()
+
+		if (not self.images) and (extension not in FOURCC):
+			print("cannot export to %s, use %s or an image pattern like frames/%%06d.png" %(filename, " or ".join(sorted(FOURCC))))
+			sys.exit(-1)
+
+		directory = os.path.dirname(filename)
+
+		if (directory != '') and not os.path.isdir(directory):
+			print("cannot export to %s, directory %s does not exist" %(filename, directory))
+			sys.exit(-1)
+
+		if self.images:
+			try:
+				filename %(0)
+			except (TypeError, ValueError):
+				print("cannot export to %s, expecting one integer pattern like frames/%%06d.png" %(filename))
+				sys.exit(-1)
+		else:
+			probe = cv.VideoWriter(filename, cv.VideoWriter_fourcc(*FOURCC[extension]), fps, PROBE_SIZE)
+			opened = probe.isOpened()
+			probe.release()
+
+			if os.path.exists(filename):
+				os.remove(filename)
+
+			if not opened:
+				print("cannot open a %s video writer for %s" %(FOURCC[extension], filename))
+				sys.exit(-1)
+
+		self.filename = filename
+		self.fourcc = FOURCC.get(extension)
+		self.fps = fps
+		self.every = every
+		self.view = view
+		self.policy = policy
+
+		self.queue = queue.Queue(queueSize)
+		self.writer = None
+		self.frameSize = None
+
+		self.frames = 0			# frames offered
+		self.queued = 0
+		self.dropped = 0
+		self.written = 0
+		self.error = None
+
+		self.thread = threading.Thread(target = self.run, daemon = True)
+		self.thread.start()
+
+	def push(self, img):
+		'''
+		offer a frame, returns at once unless the queue is full and the policy is 'block'
+		'''
+
+		self.frames += 1
+
+		if (self.frames - 1) % self.every != 0:
+			return
+
+		# the writer failed, nothing is written anymore
+		if not self.thread.is_alive():
+			self.dropped += 1
+			return
+
+		# the frame buffer is drawn again next frame, queue a copy
+		img = img.copy()
+
+		if self.policy == 'block':
+			if not self.put(img):
+				self.dropped += 1
+				return
+		else:
+			try:
+				self.queue.put_nowait(img)
+			except queue.Full:
+				self.dropped += 1
+				return
+
+		self.queued += 1
+
+	def put(self, item):
+		'''
+		wait for room in the queue as long as the writer thread lives
+		returns False if it died
+		'''
+
+		while self.thread.is_alive():
+			try:
+				self.queue.put(item, timeout = WAIT)
+				return True
+			except queue.Full:
+				pass
+
+		return False
+
+	def run(self):
+
+		while True:
+			img = self.queue.get()
+
+			if img is None:
+				return
+
+			if not self.write(img):
+				print("export to %s failed: %s, no more frames are written" %(self.filename, self.error))
+				return
+
+	def write(self, img):
+		'''
+		encode one frame, returns False (and sets error) when it could not be written
+		'''
+
+		if self.images:
+			filename = self.filename %(self.written)
+
+			if not cv.imwrite(filename, img):
+				self.error = "cannot write %s" %(filename)
+				return False
+		else:
+			if self.writer is None:
+				self.frameSize = (img.shape[1], img.shape[0])
+				self.writer = cv.VideoWriter(self.filename, cv.VideoWriter_fourcc(*self.fourcc), self.fps, self.frameSize)
+
+				if not self.writer.isOpened():
+					self.error = "cannot open the video writer"
+					return False
+
+			# every frame of a video has the size of the first one
+			if (img.shape[1], img.shape[0]) != self.frameSize:
+				img = cv.resize(img, self.frameSize)
+
+			self.writer.write(img)
+
+		self.written += 1
+
+		return True
+
+	def close(self):
+		'''
+		encode what is queued and close the file
+		'''
+
+		self.put(None)
+		self.thread.join()
+
+		if self.writer is not None:
+			self.writer.release()
+
+		if self.error is not None:
+			print("export to %s failed after %d frames: %s" %(self.filename, self.written, self.error))
+			sys.exit(-1)
+
+		print("exported %d frames to %s, %d dropped" %(self.written, self.filename, self.dropped))